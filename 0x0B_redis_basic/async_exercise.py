@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Module for implementing an asyncio variant of the Cache class with
+redis.asyncio, and the matching decorators and replay function.
+"""
+import time
+import uuid
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import (Union, Callable, Optional, Any, Dict, List, Tuple,
+                    AsyncIterator)
+
+import redis.asyncio
+
+exercise = __import__('exercise')
+
+# Commands queued by the decorated calls in progress, per object, for the
+# current task.
+_calls: ContextVar[Dict[int, List[Tuple[str, tuple]]]] = ContextVar(
+    'calls', default={}
+)
+
+
+@asynccontextmanager
+async def _call_context(obj: Any) -> AsyncIterator[List[Tuple[str, tuple]]]:
+    """
+    Collects the Redis commands issued during one decorated call.
+
+    The outermost decorated call of an object opens the context; nested
+    decorators and the method itself queue their commands in it, and they
+    are all sent in one MULTI/EXEC pipeline when the outermost call ends,
+    even if it raised; call_history queues nothing for a call that
+    raised. The queue lives in a context variable, so the
+    concurrent calls of several tasks never mix their commands.
+
+    Args:
+        obj: The object whose `_redis` client receives the commands.
+
+    Yields:
+        List[Tuple[str, tuple]]: The queued (command name, arguments)
+        tuples.
+    """
+    contexts = _calls.get()
+    queued = contexts.get(id(obj))
+    if queued is not None:
+        yield queued
+        return
+    queued = []
+    token = _calls.set({**contexts, id(obj): queued})
+    try:
+        yield queued
+    finally:
+        _calls.reset(token)
+        if queued:
+            pipe = obj._redis.pipeline(transaction=True)
+            for command, args in queued:
+                getattr(pipe, command)(*args)
+            await pipe.execute()
+
+
+async def _issue(obj: Any, command: str, *args: Any) -> None:
+    """
+    Queues a command in the decorated call in progress, or sends it at
+    once when there is none.
+
+    Args:
+        obj: The object whose `_redis` client receives the command.
+        command (str): The name of the Redis client method, e.g. 'rpush'.
+        *args: The arguments of the command.
+    """
+    queued = _calls.get().get(id(obj))
+    if queued is None:
+        await getattr(obj._redis, command)(*args)
+    else:
+        queued.append((command, args))
+
+
+def _has_redis(obj: Any) -> bool:
+    """
+    Tells whether an object has a `_redis` attribute holding an asyncio
+    Redis client.
+
+    Args:
+        obj: The object to check.
+    """
+    return (hasattr(obj, '_redis') and
+            isinstance(obj._redis, redis.asyncio.Redis))
+
+
+async def _push_history(obj: Any, key: str, *values: Any) -> None:
+    """
+    Appends entries to a history list, trimmed to the object's
+    `_history_max_length` newest entries when it is set.
+
+    Args:
+        obj: The object whose `_redis` client receives the commands.
+        key (str): The key of the history list.
+        *values: The entries to append.
+    """
+    await _issue(obj, 'rpush', key, *values)
+    max_length = getattr(obj, '_history_max_length', None)
+    if max_length is not None:
+        await _issue(obj, 'ltrim', key, -max_length, -1)
+
+
+def count_calls(method: Callable) -> Callable:
+    """
+    Decorator to count the number of times a coroutine method is called.
+
+    It uses the method's qualified name as the key in Redis to store the
+    count, as exercise.count_calls does. The INCR is queued with the other
+    commands of the call and sent in the same pipeline.
+
+    Args:
+        method (Callable): The coroutine method to be decorated.
+
+    Returns:
+        Callable: The wrapped coroutine method with call counting.
+    """
+    key_template = method.__qualname__
+
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs) -> Any:
+        """
+        Wrapper coroutine that increments the call count in Redis and then
+        awaits the original method.
+        """
+        if not _has_redis(self):
+            return await method(self, *args, **kwargs)
+        async with _call_context(self):
+            await _issue(self, 'incr', key_template)
+            return await method(self, *args, **kwargs)
+    return wrapper
+
+
+def call_history(method: Callable) -> Callable:
+    """
+    Decorator to store the history of inputs and outputs of a coroutine
+    method.
+
+    The lists and their options (`_history_max_length`,
+    `_history_sample_rate`, `_compact_history` and `_history_timestamps`)
+    are the same as for exercise.call_history, so replay reads the history
+    of both variants.
+
+    Args:
+        method (Callable): The coroutine method to be decorated.
+
+    Returns:
+        Callable: The wrapped coroutine method with history logging.
+    """
+    inputs_key = method.__qualname__ + ":inputs"
+    outputs_key = method.__qualname__ + ":outputs"
+    times_key = method.__qualname__ + ":times"
+
+    @wraps(method)
+    async def wrapper(self, *args, **kwargs) -> Any:
+        """
+        Wrapper coroutine that logs input arguments and output to Redis
+        lists.
+        """
+        if not _has_redis(self):
+            return await method(self, *args, **kwargs)
+        inputs = exercise._history_input(self, args)
+        if inputs is None:
+            return await method(self, *args, **kwargs)
+
+        async with _call_context(self):
+            started = time.time()
+            output = await method(self, *args, **kwargs)
+            # Queued only once the call returned, as in
+            # exercise.call_history
+            if getattr(self, '_history_timestamps', False):
+                await _push_history(self, times_key, started)
+            await _push_history(self, inputs_key, inputs)
+            await _push_history(self, outputs_key, output)
+        return output
+    return wrapper
+
+
+async def replay(method: Callable, last: Optional[int] = None,
+                 since: Optional[float] = None,
+                 until: Optional[float] = None,
+                 output_format: str = "text",
+                 chunk_size: int = 1000) -> None:
+    """
+    Displays the history of calls of a coroutine method.
+
+    The output and the arguments are the same as for exercise.replay; the
+    history is streamed in LRANGE windows of chunk_size entries.
+
+    Args:
+        method (Callable): The decorated method (e.g., AsyncCache.store),
+                           bound to an instance with a `_redis` attribute
+                           holding an asyncio Redis client.
+        last (Optional[int]): Only the newest `last` calls are shown.
+        since (Optional[float]): Only calls at or after this UNIX time
+                                 are shown.
+        until (Optional[float]): Only calls before this UNIX time are
+                                 shown.
+        output_format (str): "text" for the usual format, or "json" for
+                             one JSON object per call and no header.
+        chunk_size (int): The number of entries read per round trip.
+    """
+    if output_format not in ("text", "json"):
+        raise ValueError("output_format must be 'text' or 'json'")
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    if not hasattr(method, '__self__') or not _has_redis(method.__self__):
+        print(
+            "Error: The provided method must be bound to an instance "
+            "that has a `_redis` attribute (asyncio Redis client)."
+        )
+        return
+
+    client = method.__self__._redis
+    method_qualname = method.__qualname__
+    inputs_key = method_qualname + ":inputs"
+    outputs_key = method_qualname + ":outputs"
+    times_key = method_qualname + ":times"
+
+    pipe = client.pipeline(transaction=True)
+    pipe.get(method_qualname)
+    pipe.llen(inputs_key)
+    pipe.llen(outputs_key)
+    pipe.llen(times_key)
+    call_count_bytes, inputs_length, outputs_length, times_length = \
+        await pipe.execute()
+    count = min(inputs_length, outputs_length)
+    times_offset = times_length - count if times_length else -count
+    if (since is not None or until is not None) and not times_length:
+        raise ValueError(
+            f"No timestamps recorded for {method_qualname}; create the "
+            "AsyncCache with history_timestamps=True to filter by time."
+        )
+
+    call_count = exercise._decode_count(method_qualname, call_count_bytes)
+    if output_format == "text":
+        print(f"{method_qualname} was called {call_count} times:")
+
+    start = 0 if last is None else max(0, count - last)
+    for window in range(start, count, chunk_size):
+        stop = min(window + chunk_size, count) - 1
+        # One snapshot per window, as in exercise._read_history
+        pipe = client.pipeline(transaction=True)
+        pipe.lrange(inputs_key, window, stop)
+        pipe.lrange(outputs_key, window, stop)
+        has_times = stop + times_offset >= 0
+        if has_times:
+            pipe.lrange(times_key, max(0, window + times_offset),
+                        stop + times_offset)
+        replies = await pipe.execute()
+        for entry in exercise._history_window(
+                window, replies[0], replies[1],
+                replies[2] if has_times else [], since, until):
+            exercise._print_call(method_qualname, entry, output_format)
+
+
+class AsyncCache:
+    """
+    A class for caching data in Redis from asyncio code.
+
+    It has the surface of exercise.Cache with coroutine methods, and
+    records the same call counts and history, so the two can share a
+    database. All the commands go through one redis.asyncio connection
+    pool, which concurrent coroutines multiplex; pass the same pool to
+    several instances to share it between them. Like Cache, it does not
+    flush the database at creation; await flush() for that.
+    """
+    def __init__(self,
+                 pool: Optional[redis.asyncio.ConnectionPool] = None,
+                 max_connections: Optional[int] = None,
+                 pool_timeout: Optional[float] = 20,
+                 history_max_length: Optional[int] = None,
+                 history_sample_rate: float = 1.0,
+                 compact_history: bool = False,
+                 history_timestamps: bool = False) -> None:
+        """
+        Initializes the AsyncCache instance.
+
+        Args:
+            pool (Optional[redis.asyncio.ConnectionPool]): The connection
+                pool to use. A pool to the local server is created when
+                None, and disconnected by close().
+            max_connections (Optional[int]): The size limit of the created
+                pool. Ignored when a pool is given. With a limit, the
+                coroutines beyond it wait for a free connection instead of
+                failing.
+            pool_timeout (Optional[float]): The number of seconds a
+                coroutine waits for a connection of a limited created pool
+                before redis.ConnectionError is raised; None waits forever.
+            history_max_length (Optional[int]): The number of newest
+                entries kept in each history list. None keeps them all.
+            history_sample_rate (float): The share of calls recorded in
+                the history, between 0 and 1. Call counts stay exact.
+            compact_history (bool): Whether long inputs are recorded as
+                their type, length and digest instead of in full.
+            history_timestamps (bool): Whether the time of each recorded
+                call is kept, so that replay can filter by time.
+        """
+        if history_max_length is not None and history_max_length <= 0:
+            raise ValueError("history_max_length must be positive")
+        if not 0.0 <= history_sample_rate <= 1.0:
+            raise ValueError("history_sample_rate must be between 0 and 1")
+        self._owns_pool: bool = pool is None
+        if pool is None:
+            if max_connections is None:
+                pool = redis.asyncio.ConnectionPool()
+            else:
+                pool = redis.asyncio.BlockingConnectionPool(
+                    max_connections=max_connections, timeout=pool_timeout
+                )
+        self._pool: redis.asyncio.ConnectionPool = pool
+        self._redis: redis.asyncio.Redis = redis.asyncio.Redis(
+            connection_pool=pool
+        )
+        self._history_max_length: Optional[int] = history_max_length
+        self._history_sample_rate: float = history_sample_rate
+        self._compact_history: bool = compact_history
+        self._history_timestamps: bool = history_timestamps
+
+    async def flush(self) -> None:
+        """
+        Flushes the Redis database, as Cache does at creation.
+        """
+        await self._redis.flushdb()
+
+    @count_calls
+    @call_history
+    async def store(self, data: Union[str, bytes, int, float]) -> str:
+        """
+        Stores the input data in Redis using a random key.
+
+        The SET and the bookkeeping commands share one MULTI/EXEC round
+        trip.
+
+        Args:
+            data: The data to be stored. Can be of type str, bytes,
+                  int, or float.
+
+        Returns:
+            str: The randomly generated key (UUID) under which the data
+                 is stored in Redis.
+        """
+        random_key: str = str(uuid.uuid4())
+        await _issue(self, 'set', random_key, data)
+        return random_key
+
+    async def get(self,
+                  key: str,
+                  fn: Optional[Callable[[bytes], Any]] = None
+                  ) -> Union[str, bytes, int, float, None]:
+        """
+        Retrieves data from Redis and optionally converts it.
+
+        Args:
+            key (str): The key of the data to retrieve.
+            fn (Optional[Callable[[bytes], Any]]): An optional callable
+                to convert the retrieved byte string data.
+                If None, the raw byte string is returned.
+
+        Returns:
+            Union[str, bytes, int, float, None]: The retrieved data, possibly
+            converted by `fn`, or None if the key does not exist.
+        """
+        data_bytes: Optional[bytes] = await self._redis.get(key)
+        if data_bytes is None:
+            return None
+        if fn is not None:
+            return fn(data_bytes)
+        return data_bytes
+
+    async def get_str(self, key: str) -> Optional[str]:
+        """
+        Retrieves data from Redis and converts it to a UTF-8 string.
+
+        Args:
+            key (str): The key of the data to retrieve.
+
+        Returns:
+            Optional[str]: The retrieved data as a string, or None if
+            the key does not exist.
+        """
+        value = await self.get(key, fn=lambda d: d.decode("utf-8"))
+        return value if isinstance(value, str) or value is None else None
+
+    async def get_int(self, key: str) -> Optional[int]:
+        """
+        Retrieves data from Redis and converts it to an integer.
+
+        Args:
+            key (str): The key of the data to retrieve.
+
+        Returns:
+            Optional[int]: The retrieved data as an integer, or None if
+            the key does not exist.
+        """
+        value = await self.get(key, fn=int)
+        return value if isinstance(value, int) or value is None else None
+
+    async def close(self) -> None:
+        """
+        Closes the client, and disconnects the pool if it was created by
+        this instance.
+        """
+        # aclose() replaced close() in redis-py 5.0.1
+        close = getattr(self._redis, 'aclose', None) or self._redis.close
+        await close()
+        if self._owns_pool:
+            await self._pool.disconnect()
+
+    async def __aenter__(self) -> 'AsyncCache':
+        """
+        Returns the cache for use in an async with statement.
+        """
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """
+        Closes the cache at the end of an async with statement.
+        """
+        await self.close()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark of payload size and encode/decode time of the Serializer
+codecs and compressions, against json as a baseline.
+
+Usage: ./bench_serialization.py [rounds]
+"""
+import json
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+serializer = __import__('serializer')
+
+PAYLOADS: Dict[str, Any] = {
+    "small dict": {"id": 42, "name": "Ada", "score": 9.5, "tags": ["a"]},
+    "1000 ints": list(range(-500, 500)),
+    "100 records": [
+        {"id": i, "user": f"user-{i % 7}", "active": i % 2 == 0,
+         "ratio": i / 3, "path": "/api/v1/items"}
+        for i in range(100)
+    ],
+    "10 KB text": "the quick brown fox jumps over the lazy dog. " * 228,
+}
+
+
+def codecs() -> List[Tuple[str, Callable[[Any], bytes],
+                           Callable[[bytes], Any]]]:
+    """
+    Returns the codecs to compare, skipping the ones whose optional
+    package is not installed.
+
+    Returns:
+        List[Tuple[str, Callable[[Any], bytes], Callable[[bytes], Any]]]:
+        The name, encode and decode function of each codec.
+    """
+    result = [("json", lambda value: json.dumps(value).encode('utf-8'),
+               json.loads)]
+    names = ["tagged"]
+    if serializer.msgpack is not None:
+        names.append("msgpack")
+    compressions = ["none", "zlib"]
+    if serializer.lz4 is not None:
+        compressions.append("lz4")
+    for name in names:
+        for compression in compressions:
+            codec = serializer.Serializer(codec=name,
+                                          compression=compression,
+                                          compress_threshold=256)
+            result.append((f"{name}+{compression}", codec.encode,
+                           codec.decode))
+    return result
+
+
+def measure(encode: Callable[[Any], bytes], decode: Callable[[bytes], Any],
+            value: Any, rounds: int) -> Tuple[int, float, float]:
+    """
+    Measures one codec on one payload.
+
+    Args:
+        encode (Callable[[Any], bytes]): The encode function.
+        decode (Callable[[bytes], Any]): The decode function.
+        value: The payload.
+        rounds (int): The number of encodes and decodes timed.
+
+    Returns:
+        Tuple[int, float, float]: The encoded size in bytes and the
+        encode and decode times in microseconds.
+    """
+    data = encode(value)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        encode(value)
+    encode_time = (time.perf_counter() - start) / rounds * 1e6
+    start = time.perf_counter()
+    for _ in range(rounds):
+        decode(data)
+    decode_time = (time.perf_counter() - start) / rounds * 1e6
+    return len(data), encode_time, decode_time
+
+
+def main() -> None:
+    """
+    Runs the benchmark and prints one table per payload.
+    """
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    for payload_name, value in PAYLOADS.items():
+        print(f"\n{payload_name}")
+        print(f"{'codec':>14} {'bytes':>8} {'encode us':>10} "
+              f"{'decode us':>10}")
+        for name, encode, decode in codecs():
+            size, encode_time, decode_time = measure(encode, decode,
+                                                     value, rounds)
+            print(f"{name:>14} {size:>8} {encode_time:>10.1f} "
+                  f"{decode_time:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
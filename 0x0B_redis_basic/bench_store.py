@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark of Cache.store throughput before and after pipelining.
+
+"before" issues INCR, RPUSH, SET and RPUSH as four round trips, as the
+decorators used to; "pipelined" is Cache.store with one MULTI/EXEC per
+call; "async" also moves the bookkeeping to a background batcher.
+
+It runs against a local redis-server, or fakeredis when no server
+answers (in-process, so round trips are nearly free there).
+
+Usage: ./bench_store.py [stores]
+"""
+import sys
+import time
+import uuid
+from typing import Tuple
+
+import redis
+
+exercise = __import__('exercise')
+
+
+def connection_pool() -> Tuple[str, redis.ConnectionPool]:
+    """
+    Returns a pool to the local server, or to fakeredis when no local
+    server answers.
+
+    Returns:
+        Tuple[str, redis.ConnectionPool]: A description of the backend in
+        use and the pool.
+    """
+    pool = exercise.shared_pool()
+    try:
+        redis.Redis(connection_pool=pool).ping()
+        return "local redis-server", pool
+    except redis.exceptions.ConnectionError:
+        import fakeredis
+        return "fakeredis", redis.ConnectionPool(
+            connection_class=fakeredis.FakeConnection,
+            server=fakeredis.FakeServer()
+        )
+
+
+def store_before(client: redis.Redis, data: str) -> str:
+    """
+    Stores data the way the decorators did before pipelining.
+
+    Args:
+        client (redis.Redis): The Redis client.
+        data (str): The data to store.
+
+    Returns:
+        str: The generated key.
+    """
+    client.incr("Cache.store")
+    client.rpush("Cache.store:inputs", str((data,)))
+    key = str(uuid.uuid4())
+    client.set(key, data)
+    client.rpush("Cache.store:outputs", key)
+    return key
+
+
+def main() -> None:
+    """
+    Runs the benchmark and prints one line per mode.
+    """
+    stores = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    backend, pool = connection_pool()
+    print(f"{stores} stores against {backend}")
+
+    client = redis.Redis(connection_pool=pool)
+    client.flushdb()
+    start = time.perf_counter()
+    for i in range(stores):
+        store_before(client, f"value-{i}")
+    elapsed = time.perf_counter() - start
+    print(f"{'before':>10}: {stores / elapsed:>10,.0f} stores/sec")
+
+    for mode, async_bookkeeping in (("pipelined", False), ("async", True)):
+        cache = exercise.Cache(async_bookkeeping=async_bookkeeping,
+                               pool=pool, flush=True)
+        start = time.perf_counter()
+        for i in range(stores):
+            cache.store(f"value-{i}")
+        cache.close()
+        elapsed = time.perf_counter() - start
+        print(f"{mode:>10}: {stores / elapsed:>10,.0f} stores/sec")
+
+
+if __name__ == "__main__":
+    main()
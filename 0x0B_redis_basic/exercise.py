@@ -2,17 +2,433 @@
 """
 Module for implementing a Cache class with Redis and utility functions.
 """
+import hashlib
+import json
+import logging
+import random
 import redis
+import threading
+import time
 import uuid
-from typing import Union, Callable, Optional, Any
+import weakref
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from itertools import islice
+from typing import (Union, Callable, Optional, Any, Dict, List, Tuple,
+                    Iterator, Iterable)
 from functools import wraps
 
+logger = logging.getLogger(__name__)
+Serializer = __import__('serializer').Serializer
+Metrics = __import__('metrics').Metrics
+InstrumentedRedis = __import__('metrics').InstrumentedRedis
+
+# Commands queued by the decorated call in progress, per thread and object.
+_calls = threading.local()
+
+
+@contextmanager
+def _call_context(obj: Any) -> Iterator[List[Tuple[str, tuple, bool]]]:
+    """
+    Collects the Redis commands issued during one decorated call.
+
+    The outermost decorated call of an object opens the context; nested
+    decorators and the method itself queue their commands in it, and they
+    are all sent in one MULTI/EXEC pipeline when the outermost call ends,
+    even if it raised; call_history queues nothing for a call that
+    raised, so the history stays paired. With asynchronous bookkeeping,
+    only the data commands are sent then and the bookkeeping goes to the
+    batcher.
+
+    Args:
+        obj: The object whose `_redis` client receives the commands.
+
+    Yields:
+        List[Tuple[str, tuple, bool]]: The queued commands, as
+        (command name, arguments, is bookkeeping) tuples.
+    """
+    contexts = _calls.__dict__.setdefault('contexts', {})
+    queued = contexts.get(id(obj))
+    if queued is not None:
+        yield queued
+        return
+    queued = contexts[id(obj)] = []
+    try:
+        yield queued
+    finally:
+        del contexts[id(obj)]
+        _send(obj, queued)
+
+
+def _send(obj: Any, queued: List[Tuple[str, tuple, bool]]) -> None:
+    """
+    Sends the commands queued by a decorated call.
+
+    The bookkeeping commands become one EVALSHA of BOOKKEEPING_SCRIPT, so
+    they are applied atomically even when they travel apart from the data
+    commands. With asynchronous bookkeeping, that script call goes to the
+    batcher; otherwise it is sent with the data commands, in one
+    MULTI/EXEC when there are several.
+
+    Args:
+        obj: The object whose `_redis` client receives the commands.
+        queued (List[Tuple[str, tuple, bool]]): The queued commands.
+    """
+    commands = [(command, args) for command, args, bookkeeping in queued
+                if not bookkeeping]
+    bookkeeping = [(command, args) for command, args, is_bookkeeping
+                   in queued if is_bookkeeping]
+    if bookkeeping:
+        script_call = ('evalsha', _bookkeeping_args(bookkeeping))
+        batcher = getattr(obj, '_batcher', None)
+        if batcher is not None:
+            batcher.add_all([script_call])
+        else:
+            commands.append(script_call)
+    if commands:
+        _execute(obj._redis, commands, transaction=True)
+
+
+# Applies the bookkeeping commands of one decorated call atomically. Each
+# command has one key, in KEYS; ARGV holds, for each command in turn, its
+# name, its number of other arguments and these arguments. Long argument
+# lists (RPUSH of a store_many chunk) are sent in slices of 1000, within
+# Lua's unpack limit.
+BOOKKEEPING_SCRIPT = """
+local position = 1
+for _, key in ipairs(KEYS) do
+    local command = ARGV[position]
+    local first = position + 2
+    local last = position + 1 + tonumber(ARGV[position + 1])
+    repeat
+        local stop = math.min(first + 999, last)
+        redis.call(command, key, unpack(ARGV, first, stop))
+        first = stop + 1
+    until first > last
+    position = last + 1
+end
+return #KEYS
+"""
+BOOKKEEPING_SHA = hashlib.sha1(BOOKKEEPING_SCRIPT.encode('utf-8')).hexdigest()
+
+
+def _bookkeeping_args(commands: List[Tuple[str, tuple]]) -> tuple:
+    """
+    Builds the EVALSHA arguments of BOOKKEEPING_SCRIPT for commands whose
+    first argument is their key (INCR, INCRBY, RPUSH, LTRIM).
+
+    Args:
+        commands (List[Tuple[str, tuple]]): The (command name, arguments)
+            pairs to apply.
+
+    Returns:
+        tuple: The script SHA1, the number of keys, the keys and ARGV.
+    """
+    keys: List[Any] = []
+    argv: List[Any] = []
+    for command, (key, *args) in commands:
+        keys.append(key)
+        argv.append(command)
+        argv.append(len(args))
+        argv.extend(args)
+    return (BOOKKEEPING_SHA, len(keys), *keys, *argv)
+
+
+def _execute(client: redis.Redis, commands: List[Tuple[str, tuple]],
+             transaction: bool) -> None:
+    """
+    Sends commands in one round trip: alone, or in a pipeline.
+
+    When the server does not know BOOKKEEPING_SCRIPT yet (first use, or a
+    restart or SCRIPT FLUSH since), the failed EVALSHA calls are sent
+    again once it is loaded; the other commands have been applied and are
+    not repeated.
+
+    Args:
+        client (redis.Redis): The client the commands are sent with.
+        commands (List[Tuple[str, tuple]]): The (command name, arguments)
+            pairs to send.
+        transaction (bool): Whether a pipeline is wrapped in MULTI/EXEC.
+    """
+    if len(commands) == 1:
+        command, args = commands[0]
+        try:
+            getattr(client, command)(*args)
+        except redis.exceptions.NoScriptError:
+            client.script_load(BOOKKEEPING_SCRIPT)
+            getattr(client, command)(*args)
+        return
+    pipe = client.pipeline(transaction=transaction)
+    for command, args in commands:
+        getattr(pipe, command)(*args)
+    results = pipe.execute(raise_on_error=False)
+    retries = [args for (command, args), result in zip(commands, results)
+               if isinstance(result, redis.exceptions.NoScriptError)]
+    if retries:
+        client.script_load(BOOKKEEPING_SCRIPT)
+        for args in retries:
+            client.evalsha(*args)
+    for result in results:
+        if isinstance(result, Exception) and \
+           not isinstance(result, redis.exceptions.NoScriptError):
+            raise result
+
+
+def _issue(obj: Any, command: str, *args: Any,
+           bookkeeping: bool = True) -> None:
+    """
+    Queues a command in the decorated call in progress, or sends it at
+    once when there is none.
+
+    Args:
+        obj: The object whose `_redis` client receives the command.
+        command (str): The name of the Redis client method, e.g. 'rpush'.
+        *args: The arguments of the command.
+        bookkeeping (bool): Whether the command only records call
+            statistics and may therefore be sent asynchronously.
+    """
+    queued = getattr(_calls, 'contexts', {}).get(id(obj))
+    if queued is None:
+        getattr(obj._redis, command)(*args)
+    else:
+        queued.append((command, args, bookkeeping))
+
+
+def _has_redis(obj: Any) -> bool:
+    """
+    Tells whether an object has a `_redis` attribute holding a Redis
+    client.
+
+    Args:
+        obj: The object to check.
+    """
+    return hasattr(obj, '_redis') and isinstance(obj._redis, redis.Redis)
+
+
+# Connection pools shared by the Cache instances of the process.
+_pools: Dict[Tuple[Any, ...], redis.ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def shared_pool(url: Optional[str] = None,
+                unix_socket_path: Optional[str] = None,
+                **kwargs: Any) -> redis.ConnectionPool:
+    """
+    Returns the connection pool of the process for a server, creating it
+    on first use.
+
+    Every Cache built from the same configuration gets the same pool, so
+    they share its connections instead of opening their own. redis-py
+    resets a pool in a forked child, so each process gets its own.
+
+    Args:
+        url (Optional[str]): A redis:// , rediss:// or unix:// URL.
+        unix_socket_path (Optional[str]): The path of a unix socket.
+        **kwargs: Other ConnectionPool arguments, e.g. db or
+            max_connections.
+
+    Returns:
+        redis.ConnectionPool: The shared pool. The local server on the
+        default port is used when neither url nor unix_socket_path is
+        given.
+    """
+    if url is not None and unix_socket_path is not None:
+        raise ValueError("give either url or unix_socket_path, not both")
+    config = (url, unix_socket_path) + tuple(sorted(kwargs.items()))
+    with _pools_lock:
+        pool = _pools.get(config)
+        if pool is None:
+            if url is not None:
+                pool = redis.ConnectionPool.from_url(url, **kwargs)
+            elif unix_socket_path is not None:
+                pool = redis.ConnectionPool(
+                    connection_class=redis.UnixDomainSocketConnection,
+                    path=unix_socket_path, **kwargs
+                )
+            else:
+                pool = redis.ConnectionPool(**kwargs)
+            _pools[config] = pool
+        return pool
+
+
+class BookkeepingBatcher:
+    """
+    Buffers bookkeeping commands and sends them from a background thread.
+
+    Commands are sent in one non-transactional pipeline per batch, when
+    batch_size commands are waiting or every interval seconds, so the
+    decorated calls themselves only pay for their data commands. The
+    bookkeeping of one call is a single script call, so the history stays
+    paired even when several processes batch into the same lists.
+
+    A batch that fails is put back and retried at the next interval; the
+    thread logs the error and keeps running. At most max_pending calls
+    are buffered, the oldest ones being dropped, and counted in
+    `dropped`, while Redis cannot be reached.
+    """
+    def __init__(self, client: redis.Redis, batch_size: int = 512,
+                 interval: float = 0.05, max_pending: int = 100000) -> None:
+        """
+        Initializes the batcher and starts its thread.
+
+        Args:
+            client (redis.Redis): The client the batches are sent with.
+            batch_size (int): The number of commands that triggers a send.
+            interval (float): The maximum number of seconds a command
+                waits before it is sent.
+            max_pending (int): The number of calls kept while they cannot
+                be sent.
+        """
+        self._client = client
+        self._batch_size = batch_size
+        self._interval = interval
+        self._max_pending = max_pending
+        self._pending: deque = deque()
+        self._send_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self.dropped: int = 0
+        self.errors: int = 0
+        # The error of the current outage, None while batches are sent
+        self.last_error: Optional[Exception] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def add_all(self, commands: List[Tuple[str, tuple]]) -> None:
+        """
+        Buffers the bookkeeping commands of one call.
+
+        Args:
+            commands (List[Tuple[str, tuple]]): The (command name,
+                arguments) pairs to send.
+        """
+        if commands:
+            self._pending.append(commands)
+            self._drop_excess()
+            if len(self._pending) >= self._batch_size:
+                self._wakeup.set()
+
+    def flush(self) -> None:
+        """
+        Sends every buffered command now.
+
+        Raises:
+            redis.RedisError: If the batch cannot be sent; it stays
+                buffered for the next flush.
+        """
+        with self._send_lock:
+            batch: List[List[Tuple[str, tuple]]] = []
+            while self._pending:
+                batch.append(self._pending.popleft())
+            if not batch:
+                return
+            try:
+                _execute(self._client, [command for commands in batch
+                                        for command in commands],
+                         transaction=False)
+            except Exception:
+                self._pending.extendleft(reversed(batch))
+                self._drop_excess()
+                raise
+
+    def close(self) -> None:
+        """
+        Stops the background thread and sends the remaining commands.
+        """
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+
+    def _drop_excess(self) -> None:
+        """
+        Drops the oldest buffered calls beyond max_pending.
+        """
+        while len(self._pending) > self._max_pending:
+            try:
+                self._pending.popleft()
+            except IndexError:
+                break
+            self.dropped += 1
+
+    def _run(self) -> None:
+        """
+        Sends the buffered commands until the batcher is closed, logging
+        the batches that fail.
+        """
+        while not self._closed:
+            self._wakeup.wait(self._interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as error:
+                # Logged once per outage, not at every retry
+                if self.last_error is None:
+                    logger.warning("bookkeeping batch not sent, retrying "
+                                   "(%d calls buffered): %r",
+                                   len(self._pending), error)
+                self.errors += 1
+                self.last_error = error
+            else:
+                if self.last_error is not None:
+                    logger.warning("bookkeeping sent again after %d "
+                                   "failures, %d calls dropped",
+                                   self.errors, self.dropped)
+                self.last_error = None
+
+
+def _close_quietly(batcher: BookkeepingBatcher) -> None:
+    """
+    Closes the batcher of a Cache that was not closed, logging what could
+    not be sent instead of raising it from a finalizer.
+    """
+    try:
+        batcher.close()
+    except Exception as error:
+        logger.warning("bookkeeping of %d calls lost at close: %r",
+                       len(batcher._pending), error)
+
+
+def timed(method: Callable) -> Callable:
+    """
+    Decorator to record the latency of a method in the Metrics of its
+    instance, Redis round trips included.
+
+    It does nothing but one attribute lookup when the instance has no
+    `_metrics`. Placed outermost, it also times the pipeline sent when
+    the decorated call ends.
+
+    Args:
+        method (Callable): The method to be decorated.
+
+    Returns:
+        Callable: The wrapped method with latency recording.
+    """
+    name = method.__qualname__
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs) -> Any:
+        """
+        Wrapper function that times the original method.
+        """
+        metrics = getattr(self, '_metrics', None)
+        if metrics is None:
+            return method(self, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            metrics.record_method(name, time.perf_counter() - start)
+    return wrapper
+
 
 def count_calls(method: Callable) -> Callable:
     """
     Decorator to count the number of times a method is called.
 
     It uses the method's qualified name as the key in Redis to store the count.
+    The INCR is queued with the other commands of the call and sent in the
+    same pipeline.
 
     Args:
         method (Callable): The method to be decorated.
@@ -31,19 +447,94 @@ def count_calls(method: Callable) -> Callable:
         'self' is expected to be an instance of a class with a `_redis`
         attribute that is a Redis client instance (e.g., the Cache class).
         """
-        if hasattr(self, '_redis') and isinstance(self._redis, redis.Redis):
-            self._redis.incr(key_template)
-        return method(self, *args, **kwargs)
+        if not _has_redis(self):
+            return method(self, *args, **kwargs)
+        with _call_context(self):
+            _issue(self, 'incr', key_template)
+            return method(self, *args, **kwargs)
     return wrapper
 
 
+# Inputs longer than this are abbreviated by compact history encoding.
+COMPACT_INPUT_LIMIT = 64
+
+
+def _compact_repr(value: Any) -> str:
+    """
+    Returns the repr of a value, abbreviated to its type, length and a
+    short digest when it is longer than COMPACT_INPUT_LIMIT.
+
+    Args:
+        value: The value to represent.
+    """
+    text = repr(value)
+    if len(text) <= COMPACT_INPUT_LIMIT:
+        return text
+    digest = hashlib.blake2b(text.encode('utf-8'), digest_size=6)
+    return "<{} len={} blake2b={}>".format(
+        type(value).__name__, len(value) if hasattr(value, '__len__')
+        else len(text), digest.hexdigest())
+
+
+def _history_input(obj: Any, args: tuple) -> Optional[str]:
+    """
+    Encodes the inputs of a call for its history, or samples it out.
+
+    The options are read from the object: `_history_sample_rate` (the
+    share of calls recorded, 1.0 by default) and `_compact_history`
+    (whether long arguments are abbreviated, False by default).
+
+    Args:
+        obj: The object whose method was called.
+        args (tuple): The positional arguments of the call.
+
+    Returns:
+        Optional[str]: The encoded inputs, or None if the call is not
+        recorded.
+    """
+    sample_rate = getattr(obj, '_history_sample_rate', 1.0)
+    if sample_rate < 1.0 and random.random() >= sample_rate:
+        return None
+    if not getattr(obj, '_compact_history', False):
+        return str(args)
+    parts = [_compact_repr(arg) for arg in args]
+    return "({}{})".format(", ".join(parts), "," if len(parts) == 1 else "")
+
+
+def _push_history(obj: Any, key: str, *values: Any) -> None:
+    """
+    Appends entries to a history list, trimmed to the object's
+    `_history_max_length` newest entries when it is set.
+
+    Args:
+        obj: The object whose `_redis` client receives the commands.
+        key (str): The key of the history list.
+        *values: The entries to append.
+    """
+    _issue(obj, 'rpush', key, *values)
+    max_length = getattr(obj, '_history_max_length', None)
+    if max_length is not None:
+        _issue(obj, 'ltrim', key, -max_length, -1)
+
+
 def call_history(method: Callable) -> Callable:
     """
     Decorator to store the history of inputs and outputs for a particular function.
 
     Every time the original function is called, it adds its input parameters
     to one list in Redis and stores its output into another list.
-    The keys are based on the decorated function's qualified name.
+    The keys are based on the decorated function's qualified name. Both
+    RPUSH commands are queued with the other commands of the call and sent
+    in the same pipeline.
+
+    The history can be bounded through attributes of the instance:
+    `_history_max_length` keeps only the newest entries (LTRIM),
+    `_history_sample_rate` records only a share of the calls, and
+    `_compact_history` abbreviates long arguments. Inputs and outputs are
+    always sampled and trimmed together, so they stay paired; a call that
+    raises is counted but not recorded. With
+    `_history_timestamps`, the time of each recorded call is appended to
+    a third list, which replay uses to filter by time.
 
     Args:
         method (Callable): The method to be decorated.
@@ -53,6 +544,7 @@ def call_history(method: Callable) -> Callable:
     """
     inputs_key_suffix = ":inputs"
     outputs_key_suffix = ":outputs"
+    times_key_suffix = ":times"
 
     @wraps(method)
     def wrapper(self, *args, **kwargs) -> Any:
@@ -67,26 +559,164 @@ def call_history(method: Callable) -> Callable:
         inputs_key = method_qualname + inputs_key_suffix
         outputs_key = method_qualname + outputs_key_suffix
 
-        if hasattr(self, '_redis') and isinstance(self._redis, redis.Redis):
-            # Store input arguments as a string representation of the tuple
-            self._redis.rpush(inputs_key, str(args))
-
-        output = method(self, *args, **kwargs)
+        if not _has_redis(self):
+            return method(self, *args, **kwargs)
+        inputs = _history_input(self, args)
+        if inputs is None:
+            return method(self, *args, **kwargs)
 
-        if hasattr(self, '_redis') and isinstance(self._redis, redis.Redis):
+        with _call_context(self):
+            started = time.time()
+            output = method(self, *args, **kwargs)
+            # Queued only once the call returned, so a call that raises
+            # leaves no unpaired input
+            if getattr(self, '_history_timestamps', False):
+                _push_history(self, method_qualname + times_key_suffix,
+                              started)
+            # Store input arguments as a string representation of the tuple
+            _push_history(self, inputs_key, inputs)
             # Store the output
-            self._redis.rpush(outputs_key, output)
+            _push_history(self, outputs_key, output)
         return output
     return wrapper
 
 
-def replay(method: Callable) -> None:
+def iter_history(client: redis.Redis, method_qualname: str,
+                 last: Optional[int] = None, since: Optional[float] = None,
+                 until: Optional[float] = None, chunk_size: int = 1000
+                 ) -> Iterator[Tuple[int, bytes, bytes, Optional[float]]]:
+    """
+    Streams the recorded calls of a method, oldest first.
+
+    The lengths of the lists are read and the arguments checked at once;
+    the entries are then read as the returned iterator is consumed. The
+    history lists are read in LRANGE windows of chunk_size entries,
+    one pipeline per window, so memory stays bounded whatever the length
+    of the history. The timestamps list, when it exists, is aligned with
+    the newest entries, since it may have been enabled after the first
+    calls were recorded.
+
+    Args:
+        client (redis.Redis): The Redis client.
+        method_qualname (str): The qualified name of the method.
+        last (Optional[int]): Only the newest `last` calls are read.
+        since (Optional[float]): Only calls at or after this UNIX time
+            are yielded. Needs recorded timestamps.
+        until (Optional[float]): Only calls before this UNIX time are
+            yielded. Needs recorded timestamps.
+        chunk_size (int): The number of entries read per round trip.
+
+    Returns:
+        Iterator[Tuple[int, bytes, bytes, Optional[float]]]: The index of
+        each call in the history, its inputs, its output and its
+        timestamp, or None when it has none.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    pipe = client.pipeline(transaction=True)
+    pipe.llen(method_qualname + ":inputs")
+    pipe.llen(method_qualname + ":outputs")
+    pipe.llen(method_qualname + ":times")
+    inputs_length, outputs_length, times_length = pipe.execute()
+    count = min(inputs_length, outputs_length)
+    times_offset = times_length - count
+    timed = since is not None or until is not None
+    if timed and not times_length:
+        raise ValueError(
+            f"No timestamps recorded for {method_qualname}; create the "
+            "Cache with history_timestamps=True to filter by time."
+        )
+
+    start = 0 if last is None else max(0, count - last)
+    return _read_history(client, method_qualname, start, count,
+                         times_offset if times_length else -count,
+                         since, until, chunk_size)
+
+
+def _read_history(client: redis.Redis, method_qualname: str, start: int,
+                  count: int, times_offset: int, since: Optional[float],
+                  until: Optional[float], chunk_size: int
+                  ) -> Iterator[Tuple[int, bytes, bytes, Optional[float]]]:
+    """
+    Reads the history windows prepared by iter_history.
+
+    Args:
+        client (redis.Redis): The Redis client.
+        method_qualname (str): The qualified name of the method.
+        start (int): The index of the first call to read.
+        count (int): The number of calls in the history.
+        times_offset (int): The index in the timestamps list of the first
+            call, or -count when there are no timestamps.
+        since (Optional[float]): The start of the time range, if any.
+        until (Optional[float]): The end of the time range, if any.
+        chunk_size (int): The number of entries read per round trip.
+
+    Yields:
+        Tuple[int, bytes, bytes, Optional[float]]: As iter_history.
+    """
+    inputs_key = method_qualname + ":inputs"
+    outputs_key = method_qualname + ":outputs"
+    times_key = method_qualname + ":times"
+    for window in range(start, count, chunk_size):
+        stop = min(window + chunk_size, count) - 1
+        # MULTI/EXEC, so the lists are read from one snapshot: a trimming
+        # RPUSH + LTRIM of another client cannot run between the ranges
+        pipe = client.pipeline(transaction=True)
+        pipe.lrange(inputs_key, window, stop)
+        pipe.lrange(outputs_key, window, stop)
+        has_times = stop + times_offset >= 0
+        if has_times:
+            pipe.lrange(times_key, max(0, window + times_offset),
+                        stop + times_offset)
+        replies = pipe.execute()
+        yield from _history_window(window, replies[0], replies[1],
+                                   replies[2] if has_times else [],
+                                   since, until)
+
+
+def _history_window(window: int, inputs: List[bytes], outputs: List[bytes],
+                    stamps: List[bytes], since: Optional[float],
+                    until: Optional[float]
+                    ) -> Iterator[Tuple[int, bytes, bytes, Optional[float]]]:
+    """
+    Pairs one window of history entries with their timestamps and
+    filters them by time.
+
+    Args:
+        window (int): The index of the first entry of the window.
+        inputs (List[bytes]): The inputs of the window.
+        outputs (List[bytes]): The outputs of the window.
+        stamps (List[bytes]): The timestamps of the newest entries of the
+            window; the oldest ones may have none.
+        since (Optional[float]): The start of the time range, if any.
+        until (Optional[float]): The end of the time range, if any.
+
+    Yields:
+        Tuple[int, bytes, bytes, Optional[float]]: As iter_history.
+    """
+    timed = since is not None or until is not None
+    times: List[Optional[float]] = [None] * len(inputs)
+    times[len(times) - len(stamps):] = [float(stamp) for stamp in stamps]
+    for index, (input_bytes, output_bytes, stamp) in enumerate(
+            zip(inputs, outputs, times), window):
+        if timed and (stamp is None or
+                      (since is not None and stamp < since) or
+                      (until is not None and stamp >= until)):
+            continue
+        yield index, input_bytes, output_bytes, stamp
+
+
+def replay(method: Callable, last: Optional[int] = None,
+           since: Optional[float] = None, until: Optional[float] = None,
+           output_format: str = "text", chunk_size: int = 1000) -> None:
     """
     Displays the history of calls of a particular function.
 
     Retrieves input and output history from Redis lists associated with
     the method's qualified name, and also retrieves the call count.
-    It then prints this history in a formatted way.
+    It then prints this history in a formatted way. The history is
+    streamed in windows of chunk_size entries (see iter_history), so
+    long histories are printed without being loaded at once.
 
     Args:
         method (Callable): The decorated method (e.g., Cache.store)
@@ -94,7 +724,17 @@ def replay(method: Callable) -> None:
                            It's expected that this method is bound to an
                            instance of a class (like Cache) that has a `_redis`
                            attribute which is a Redis client instance.
+        last (Optional[int]): Only the newest `last` calls are shown.
+        since (Optional[float]): Only calls at or after this UNIX time
+                                 are shown.
+        until (Optional[float]): Only calls before this UNIX time are
+                                 shown.
+        output_format (str): "text" for the usual format, or "json" for
+                             one JSON object per call and no header.
+        chunk_size (int): The number of entries read per round trip.
     """
+    if output_format not in ("text", "json"):
+        raise ValueError("output_format must be 'text' or 'json'")
     if not hasattr(method, '__self__') or \
        not hasattr(method.__self__, '_redis') or \
        not isinstance(method.__self__._redis, redis.Redis):
@@ -104,16 +744,40 @@ def replay(method: Callable) -> None:
         )
         return
 
+    batcher = getattr(method.__self__, '_batcher', None)
+    if batcher is not None:
+        batcher.flush()
+
     redis_client = method.__self__._redis
     method_qualname = method.__qualname__
 
     # Keys used by decorators
     count_key = method_qualname
-    inputs_key = method_qualname + ":inputs"
-    outputs_key = method_qualname + ":outputs"
 
     # Retrieve call count
-    call_count_bytes = redis_client.get(count_key)
+    call_count = _decode_count(count_key, redis_client.get(count_key))
+
+    history = iter_history(redis_client, method_qualname, last=last,
+                           since=since, until=until, chunk_size=chunk_size)
+    if output_format == "text":
+        print(f"{method_qualname} was called {call_count} times:")
+
+    # Inputs and outputs are streamed pair-wise
+    for entry in history:
+        _print_call(method_qualname, entry, output_format)
+
+
+def _decode_count(count_key: str, call_count_bytes: Optional[bytes]) -> int:
+    """
+    Decodes a call count read from Redis.
+
+    Args:
+        count_key (str): The key of the count, for the warning.
+        call_count_bytes (Optional[bytes]): The value read, if any.
+
+    Returns:
+        int: The call count, or 0 if it is missing or invalid.
+    """
     call_count = 0
     if call_count_bytes:
         try:
@@ -121,72 +785,288 @@ def replay(method: Callable) -> None:
         except (ValueError, UnicodeDecodeError):
             # If decoding or int conversion fails, keep count as 0 or log warning
             print(f"Warning: Could not decode call count for '{count_key}'.")
+    return call_count
 
-    # Retrieve inputs and outputs history
-    # LRANGE returns a list of bytes [1]
-    inputs_history_bytes = redis_client.lrange(inputs_key, 0, -1)
-    outputs_history_bytes = redis_client.lrange(outputs_key, 0, -1)
 
-    print(f"{method_qualname} was called {call_count} times:")
+def _print_call(method_qualname: str,
+                entry: Tuple[int, bytes, bytes, Optional[float]],
+                output_format: str) -> None:
+    """
+    Prints one call of a history, as replay does.
 
-    # Zip inputs and outputs to display them pair-wise
-    for input_bytes, output_bytes in zip(inputs_history_bytes,
-                                         outputs_history_bytes):
-        try:
-            # Inputs were stored as str(args), e.g., "('foo',)"
-            # Outputs were stored directly (e.g., UUID string for store method)
-            input_str = input_bytes.decode('utf-8')
-            output_str = output_bytes.decode('utf-8')
+    Args:
+        method_qualname (str): The qualified name of the method.
+        entry (Tuple[int, bytes, bytes, Optional[float]]): The call, as
+            yielded by iter_history.
+        output_format (str): "text" or "json".
+    """
+    index, input_bytes, output_bytes, stamp = entry
+    try:
+        # Inputs were stored as str(args), e.g., "('foo',)"
+        # Outputs were stored directly (e.g., UUID string for store method)
+        input_str = input_bytes.decode('utf-8')
+        output_str = output_bytes.decode('utf-8')
+    except UnicodeDecodeError:
+        print(
+            f"Warning: Could not decode history entry for {method_qualname}"
+        )
+        return
+
+    if output_format == "json":
+        print(json.dumps({"method": method_qualname, "index": index,
+                          "time": stamp, "inputs": input_str,
+                          "output": output_str}))
+    else:
+        # The format is MethodName(*args_representation) -> output
+        # Example: Cache.store(*('foo',)) -> some-uuid
+        print(f"{method_qualname}(*{input_str}) -> {output_str}")
+
+
+class NearCache:
+    """
+    A bounded, in-process LRU tier kept in front of Redis reads.
+
+    It holds the raw bytes read from Redis, so repeated reads of hot keys
+    skip the network round trip. Entries are invalidated when the Cache
+    writes their key; writes made by other clients are not seen, which is
+    why it suits values that are never overwritten, such as the ones
+    stored under random UUID keys.
+    """
+    def __init__(self, max_items: int) -> None:
+        """
+        Initializes the near cache.
+
+        Args:
+            max_items (int): The maximum number of entries kept.
+        """
+        if max_items <= 0:
+            raise ValueError("max_items must be positive")
+        self.max_items: int = max_items
+        self._data: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.invalidations: int = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Retrieves the bytes cached for a key and marks it recently used.
+
+        Args:
+            key (str): The key to look up.
+
+        Returns:
+            Optional[bytes]: The cached bytes, or None on a miss.
+        """
+        with self._lock:
+            data = self._data.get(key)
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._data.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Caches the bytes read for a key, evicting the least recently used
+        entry when full.
+
+        Args:
+            key (str): The key read from Redis.
+            data (bytes): The bytes Redis returned.
+        """
+        with self._lock:
+            self._data[key] = data
+            self._data.move_to_end(key)
+            if len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        """
+        Drops the entry of a key that has been written.
 
-            # The format is MethodName(*args_representation) -> output
-            # Example: Cache.store(*('foo',)) -> some-uuid
-            print(f"{method_qualname}(*{input_str}) -> {output_str}")
-        except UnicodeDecodeError:
-            print(
-                f"Warning: Could not decode history entry for {method_qualname}"
-            )
+        Args:
+            key (str): The key written to Redis.
+        """
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """
+        Returns the counters of the near cache.
+
+        Returns:
+            Dict[str, Union[int, float]]: The number of entries, the hit,
+            miss, eviction and invalidation counts, and the hit ratio.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'items': len(self._data),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_ratio': self.hits / lookups if lookups else 0.0
+            }
 
 
 class Cache:
     """
     A class for caching data in Redis.
 
-    This class initializes a connection to a Redis server, flushes the database
-    on initialization, and provides methods to store data with a randomly
-    generated key, and retrieve data, optionally converting it to its
-    original type. Methods can be decorated to count their calls and log
-    their input/output history.
+    This class initializes a connection to a Redis server, optionally
+    flushes the database on initialization, and provides methods to store
+    data with a randomly generated key, and retrieve data, optionally
+    converting it to its original type. Methods can be decorated to count
+    their calls and log their input/output history; a decorated call sends
+    all its commands in one pipeline. Reads can optionally go through an
+    in-process NearCache tier.
     """
-    def __init__(self) -> None:
+    def __init__(self, near_cache_size: int = 0,
+                 async_bookkeeping: bool = False,
+                 history_max_length: Optional[int] = None,
+                 history_sample_rate: float = 1.0,
+                 compact_history: bool = False,
+                 history_timestamps: bool = False,
+                 pool: Optional[redis.ConnectionPool] = None,
+                 url: Optional[str] = None,
+                 unix_socket_path: Optional[str] = None,
+                 flush: bool = False,
+                 serializer: Optional[Serializer] = None,
+                 metrics: Optional[Metrics] = None) -> None:
         """
         Initializes the Cache instance.
 
-        This method creates a private Redis client instance and flushes
-        the Redis database associated with that instance.
+        This method creates a private Redis client instance on a
+        connection pool: the given one, or the shared_pool of the url or
+        unix socket, or of the local server. Instances built from the same
+        configuration therefore share their connections, and creating one
+        costs no round trip unless flush is set.
+
+        Args:
+            near_cache_size (int): The number of entries of the in-process
+                near cache kept in front of get. 0 disables it.
+            async_bookkeeping (bool): Whether the call counts and history
+                are sent in batches by a background thread instead of
+                with each call.
+            history_max_length (Optional[int]): The number of newest
+                entries kept in each history list. None keeps them all.
+            history_sample_rate (float): The share of calls recorded in
+                the history, between 0 and 1. Call counts stay exact.
+            compact_history (bool): Whether long inputs are recorded as
+                their type, length and digest instead of in full.
+            history_timestamps (bool): Whether the time of each recorded
+                call is kept, so that replay can filter by time.
+            pool (Optional[redis.ConnectionPool]): The connection pool to
+                use instead of a shared one.
+            url (Optional[str]): The URL of the server, e.g.
+                redis://localhost:6379/0 or unix:///tmp/redis.sock.
+            unix_socket_path (Optional[str]): The unix socket of the
+                server.
+            flush (bool): Whether the Redis database is flushed, which
+                deletes every key in it, including other clients' ones.
+            serializer (Optional[Serializer]): The serialization of the
+                stored values. With one, store accepts lists, tuples,
+                dicts and None too, and get returns values with their
+                original type. Without, values are stored as redis-py
+                encodes them and read back as bytes.
+            metrics (Optional[Metrics]): Where the latency, payload size
+                and error metrics of the Redis commands and of the Cache
+                methods are recorded; several instances may share one.
+                None disables the instrumentation.
         """
-        self._redis: redis.Redis = redis.Redis()
-        self._redis.flushdb()
+        if pool is not None and (url is not None or
+                                 unix_socket_path is not None):
+            raise ValueError("give either pool or url/unix_socket_path")
+        if history_max_length is not None and history_max_length <= 0:
+            raise ValueError("history_max_length must be positive")
+        if not 0.0 <= history_sample_rate <= 1.0:
+            raise ValueError("history_sample_rate must be between 0 and 1")
+        if pool is None:
+            pool = shared_pool(url, unix_socket_path)
+        self._metrics: Optional[Metrics] = metrics
+        self._redis: redis.Redis = (
+            redis.Redis(connection_pool=pool) if metrics is None
+            else InstrumentedRedis(connection_pool=pool, metrics=metrics)
+        )
+        if flush:
+            self._redis.flushdb()
+        self._near: Optional[NearCache] = (
+            NearCache(near_cache_size) if near_cache_size > 0 else None
+        )
+        self._batcher: Optional[BookkeepingBatcher] = (
+            BookkeepingBatcher(self._redis) if async_bookkeeping else None
+        )
+        # Stops the thread of a Cache collected or alive at exit without
+        # close(); it only holds the batcher, not the Cache
+        self._finalizer: Optional[weakref.finalize] = (
+            weakref.finalize(self, _close_quietly, self._batcher)
+            if self._batcher is not None else None
+        )
+        self._history_max_length: Optional[int] = history_max_length
+        self._history_sample_rate: float = history_sample_rate
+        self._compact_history: bool = compact_history
+        self._history_timestamps: bool = history_timestamps
+        self._serializer: Optional[Serializer] = serializer
 
+    @timed
     @count_calls
     @call_history
-    def store(self, data: Union[str, bytes, int, float]) -> str:
+    def store(self, data: Any) -> str:
         """
         Stores the input data in Redis using a random key.
         The number of times this method is called is tracked in Redis.
         The history of its inputs and outputs is also logged to Redis lists.
+        The SET and the bookkeeping commands share one MULTI/EXEC round
+        trip.
 
         Args:
             data: The data to be stored. Can be of type str, bytes,
-                  int, or float.
+                  int, or float, or any type the serializer supports.
 
         Returns:
             str: The randomly generated key (UUID) under which the data
                  is stored in Redis.
         """
         random_key: str = str(uuid.uuid4())
-        self._redis.set(random_key, data)
+        _issue(self, 'set', random_key, self._encode(data),
+               bookkeeping=False)
+        if self._near is not None:
+            self._near.invalidate(random_key)
         return random_key
 
+    def _encode(self, data: Any) -> Any:
+        """
+        Serializes a value to store when the Cache has a serializer.
+
+        Args:
+            data: The value to store.
+        """
+        if self._serializer is None:
+            return data
+        return self._serializer.encode(data)
+
+    def _decode(self, data_bytes: bytes,
+                fn: Optional[Callable[[Any], Any]]) -> Any:
+        """
+        Deserializes a value read from Redis when the Cache has a
+        serializer, then converts it with fn when given.
+
+        Args:
+            data_bytes (bytes): The bytes read.
+            fn (Optional[Callable[[Any], Any]]): The conversion, if any.
+        """
+        value: Any = data_bytes
+        if self._serializer is not None:
+            value = self._serializer.decode(data_bytes)
+        return value if fn is None else fn(value)
+
+    @timed
     def get(self,
             key: str,
             fn: Optional[Callable[[bytes], Any]] = None
@@ -194,6 +1074,11 @@ class Cache:
         """
         Retrieves data from Redis and optionally converts it.
 
+        When the near cache is enabled, the bytes of recently read keys are
+        served from it without a round trip to Redis. When the Cache has a
+        serializer, the value is deserialized first and fn, if given,
+        receives the deserialized value.
+
         Args:
             key (str): The key of the data to retrieve.
             fn (Optional[Callable[[bytes], Any]]): An optional callable
@@ -204,13 +1089,17 @@ class Cache:
             Union[str, bytes, int, float, None]: The retrieved data, possibly
             converted by `fn`, or None if the key does not exist.
         """
-        data_bytes: Optional[bytes] = self._redis.get(key)
+        data_bytes: Optional[bytes] = None
+        if self._near is not None:
+            data_bytes = self._near.get(key)
         if data_bytes is None:
-            return None
+            data_bytes = self._redis.get(key)
+            if data_bytes is None:
+                return None
+            if self._near is not None:
+                self._near.put(key, data_bytes)
 
-        if fn is not None:
-            return fn(data_bytes)
-        return data_bytes
+        return self._decode(data_bytes, fn)
 
     def get_str(self, key: str) -> Optional[str]:
         """
@@ -223,7 +1112,8 @@ class Cache:
             Optional[str]: The retrieved data as a string, or None if
             the key does not exist or data cannot be decoded.
         """
-        value = self.get(key, fn=lambda d: d.decode("utf-8"))
+        value = self.get(key, fn=lambda d: d.decode("utf-8")
+                         if isinstance(d, bytes) else d)
         # Ensure the return type strictly matches Optional[str]
         return value if isinstance(value, str) or value is None else None
 
@@ -241,3 +1131,157 @@ class Cache:
         value = self.get(key, fn=int)
         # Ensure the return type strictly matches Optional[int]
         return value if isinstance(value, int) or value is None else None
+
+    @timed
+    def store_many(self, values: Iterable[Any],
+                   chunk_size: int = 1000) -> List[str]:
+        """
+        Stores many values in Redis, each under its own random key.
+
+        Values are sent chunk_size at a time: each chunk is one MSET plus
+        the bookkeeping of Cache.store (INCRBY of the call count and one
+        RPUSH per history list), in a single MULTI/EXEC round trip. The
+        count and history therefore read as if store had been called once
+        per value, with the same sampling, trimming and encoding, and
+        replay(cache.store) shows them.
+
+        Args:
+            values (Iterable[Any]): The data to be stored, as for store;
+                it is consumed lazily, one chunk at a time.
+            chunk_size (int): The maximum number of values per round trip.
+
+        Returns:
+            List[str]: The generated keys, in the order of the values.
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        qualname = self.store.__qualname__
+        keys: List[str] = []
+        iterator = iter(values)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return keys
+            chunk_keys = [str(uuid.uuid4()) for _ in chunk]
+            with _call_context(self):
+                _issue(self, 'mset', {key: self._encode(data) for key, data
+                                      in zip(chunk_keys, chunk)},
+                       bookkeeping=False)
+                _issue(self, 'incrby', qualname, len(chunk))
+                inputs: List[str] = []
+                outputs: List[str] = []
+                for data, key in zip(chunk, chunk_keys):
+                    entry = _history_input(self, (data,))
+                    if entry is not None:
+                        inputs.append(entry)
+                        outputs.append(key)
+                if inputs and self._history_timestamps:
+                    _push_history(self, qualname + ":times",
+                                  *[time.time()] * len(inputs))
+                if inputs:
+                    _push_history(self, qualname + ":inputs", *inputs)
+                    _push_history(self, qualname + ":outputs", *outputs)
+            if self._near is not None:
+                for key in chunk_keys:
+                    self._near.invalidate(key)
+            keys.extend(chunk_keys)
+
+    @timed
+    def get_many(self,
+                 keys: Iterable[str],
+                 fn: Optional[Callable[[bytes], Any]] = None,
+                 chunk_size: int = 1000
+                 ) -> List[Union[str, bytes, int, float, None]]:
+        """
+        Retrieves many values from Redis and optionally converts them.
+
+        Keys found in the near cache, if enabled, are served from it; the
+        others are read with one MGET per chunk_size keys.
+
+        Args:
+            keys (Iterable[str]): The keys of the data to retrieve.
+            fn (Optional[Callable[[bytes], Any]]): An optional callable
+                applied to every value found, after deserialization if the
+                Cache has a serializer.
+            chunk_size (int): The maximum number of keys per MGET.
+
+        Returns:
+            List[Union[str, bytes, int, float, None]]: The values, in the
+            order of the keys, with None for the keys that do not exist.
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        keys = list(keys)
+        values: List[Optional[bytes]] = [None] * len(keys)
+        missing: List[int] = []
+        for position, key in enumerate(keys):
+            if self._near is not None:
+                values[position] = self._near.get(key)
+            if values[position] is None:
+                missing.append(position)
+
+        for start in range(0, len(missing), chunk_size):
+            positions = missing[start:start + chunk_size]
+            found = self._redis.mget([keys[p] for p in positions])
+            for position, data in zip(positions, found):
+                values[position] = data
+                if data is not None and self._near is not None:
+                    self._near.put(keys[position], data)
+
+        return [None if data is None else self._decode(data, fn)
+                for data in values]
+
+    def flush_bookkeeping(self) -> None:
+        """
+        Sends the call counts and history buffered by asynchronous
+        bookkeeping, if enabled.
+        """
+        if self._batcher is not None:
+            self._batcher.flush()
+
+    def close(self) -> None:
+        """
+        Stops the asynchronous bookkeeping thread after sending what it
+        buffered. The Cache keeps working with synchronous bookkeeping.
+        """
+        if self._finalizer is not None:
+            batcher = self._batcher
+            self._finalizer.detach()
+            self._batcher = self._finalizer = None
+            batcher.close()
+
+    def __enter__(self) -> 'Cache':
+        """
+        Returns the Cache, closed when the with block ends.
+        """
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """
+        Closes the Cache.
+        """
+        self.close()
+
+    def near_cache_stats(self) -> Optional[Dict[str, Union[int, float]]]:
+        """
+        Returns the counters of the near cache.
+
+        Returns:
+            Optional[Dict[str, Union[int, float]]]: The statistics of the
+            near cache, or None if it is disabled.
+        """
+        if self._near is None:
+            return None
+        return self._near.stats()
+
+    def metrics_snapshot(self) -> Optional[Dict[str, Any]]:
+        """
+        Returns a copy of the metrics of the Cache.
+
+        Returns:
+            Optional[Dict[str, Any]]: The snapshot of its Metrics (see
+            Metrics.snapshot), or None if it is not instrumented.
+        """
+        if self._metrics is None:
+            return None
+        return self._metrics.snapshot()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Module for implementing client-side metrics of the Redis Cache: latency
+and payload size histograms, error counts, and their Prometheus text
+exposition.
+"""
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis
+
+# Each power of two is split in 2 ** (SUB_BUCKET_BITS - 1) linear
+# sub-buckets, so a recorded value is off by at most 1 / 16 (6.25%).
+SUB_BUCKET_BITS = 5
+_HALF = 1 << (SUB_BUCKET_BITS - 1)
+
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+class Histogram:
+    """
+    A histogram of non-negative integers with HDR-style log-linear
+    buckets.
+
+    Recording is a bit_length and a list increment, and the memory is a
+    few hundred counters whatever the number of values, with a relative
+    error bounded by SUB_BUCKET_BITS. It is not thread-safe by itself;
+    Metrics serializes the updates.
+    """
+    def __init__(self) -> None:
+        """
+        Initializes an empty histogram.
+        """
+        self.counts: List[int] = []
+        self.count: int = 0
+        self.total: int = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    @staticmethod
+    def _index(value: int) -> int:
+        """
+        Returns the bucket of a value.
+
+        Args:
+            value (int): The value, at least 0.
+        """
+        exponent = value.bit_length() - SUB_BUCKET_BITS
+        if exponent <= 0:
+            return value
+        return exponent * _HALF + (value >> exponent)
+
+    @staticmethod
+    def _upper(index: int) -> int:
+        """
+        Returns the highest value of a bucket.
+
+        Args:
+            index (int): The bucket.
+        """
+        exponent = max(0, index // _HALF - 1)
+        mantissa = index - exponent * _HALF
+        return ((mantissa + 1) << exponent) - 1
+
+    def record(self, value: int) -> None:
+        """
+        Records a value.
+
+        Args:
+            value (int): The value, at least 0.
+        """
+        index = self._index(value)
+        if index >= len(self.counts):
+            self.counts.extend([0] * (index + 1 - len(self.counts)))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> int:
+        """
+        Returns an upper bound of the q-quantile of the recorded values.
+
+        Args:
+            q (float): The quantile, between 0 and 1.
+
+        Returns:
+            int: The highest value of the bucket holding the quantile,
+            capped by the maximum; 0 when nothing was recorded.
+        """
+        if not self.count:
+            return 0
+        rank = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self._upper(index), self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns the summary of the histogram.
+
+        Returns:
+            Dict[str, Any]: The count, sum, min, max, mean and quantiles.
+        """
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'min': self.min or 0,
+            'max': self.max or 0,
+            'mean': self.total / self.count if self.count else 0.0,
+            'quantiles': {q: self.quantile(q) for q in QUANTILES},
+        }
+
+
+class Metrics:
+    """
+    The metrics of one or more Cache instances.
+
+    Latencies are recorded in microseconds per Redis command (a pipeline
+    counts as one MULTI or PIPELINE command) and per Cache method, so the
+    time of a method outside Redis is its latency minus the latency of
+    its commands. Payload sizes are the bytes of the arguments sent and
+    of the bulk replies received, per command. Errors are counted per
+    command and exception type.
+    """
+    def __init__(self) -> None:
+        """
+        Initializes empty metrics.
+        """
+        self._lock = threading.Lock()
+        self.commands: Dict[str, Histogram] = defaultdict(Histogram)
+        self.methods: Dict[str, Histogram] = defaultdict(Histogram)
+        self.request_bytes: Dict[str, Histogram] = defaultdict(Histogram)
+        self.response_bytes: Dict[str, Histogram] = defaultdict(Histogram)
+        self.errors: Dict[Tuple[str, str], int] = defaultdict(int)
+
+    def record_command(self, command: str, seconds: float,
+                       request_bytes: int, response_bytes: int) -> None:
+        """
+        Records one Redis command or pipeline.
+
+        Args:
+            command (str): The command name, e.g. 'GET' or 'MULTI'.
+            seconds (float): Its latency.
+            request_bytes (int): The size of its arguments.
+            response_bytes (int): The size of its reply.
+        """
+        with self._lock:
+            self.commands[command].record(int(seconds * 1e6))
+            self.request_bytes[command].record(request_bytes)
+            self.response_bytes[command].record(response_bytes)
+
+    def record_method(self, method: str, seconds: float) -> None:
+        """
+        Records one call of a Cache method.
+
+        Args:
+            method (str): The qualified name of the method.
+            seconds (float): Its latency.
+        """
+        with self._lock:
+            self.methods[method].record(int(seconds * 1e6))
+
+    def record_error(self, command: str, error: BaseException) -> None:
+        """
+        Counts an error of a Redis command.
+
+        Args:
+            command (str): The command name.
+            error (BaseException): The error raised or replied.
+        """
+        with self._lock:
+            self.errors[command, type(error).__name__] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns a consistent copy of the metrics.
+
+        Returns:
+            Dict[str, Any]: 'commands' and 'methods' map names to latency
+            summaries in microseconds, 'request_bytes' and
+            'response_bytes' map command names to size summaries, and
+            'errors' maps "COMMAND:ErrorType" to counts.
+        """
+        with self._lock:
+            return {
+                'commands': {name: histogram.snapshot() for name, histogram
+                             in self.commands.items()},
+                'methods': {name: histogram.snapshot() for name, histogram
+                            in self.methods.items()},
+                'request_bytes': {name: histogram.snapshot() for name,
+                                  histogram in self.request_bytes.items()},
+                'response_bytes': {name: histogram.snapshot() for name,
+                                   histogram in self.response_bytes.items()},
+                'errors': {f"{command}:{error}": count for
+                           (command, error), count in self.errors.items()},
+            }
+
+
+def _size(value: Any) -> int:
+    """
+    Returns the approximate wire size of an argument or reply.
+
+    Args:
+        value: The argument or reply.
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    if isinstance(value, (list, tuple)):
+        return sum(_size(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_size(key) + _size(item) for key, item in value.items())
+    if value is None or isinstance(value, bool):
+        return 0
+    return len(repr(value))
+
+
+class InstrumentedRedis(redis.Redis):
+    """
+    A Redis client recording the latency, payload sizes and errors of its
+    commands and pipelines in a Metrics instance.
+    """
+    def __init__(self, *args: Any, metrics: Optional[Metrics] = None,
+                 **kwargs: Any) -> None:
+        """
+        Initializes the client.
+
+        Args:
+            *args: The arguments of redis.Redis.
+            metrics (Optional[Metrics]): Where the metrics are recorded.
+                A new Metrics is created when None.
+            **kwargs: The keyword arguments of redis.Redis.
+        """
+        super().__init__(*args, **kwargs)
+        self.metrics: Metrics = metrics if metrics is not None \
+            else Metrics()
+
+    def execute_command(self, *args: Any, **options: Any) -> Any:
+        """
+        Executes a command and records its metrics.
+        """
+        command = str(args[0]).upper()
+        start = time.perf_counter()
+        try:
+            reply = super().execute_command(*args, **options)
+        except Exception as error:
+            self.metrics.record_error(command, error)
+            raise
+        self.metrics.record_command(command, time.perf_counter() - start,
+                                    _size(args[1:]), _size(reply))
+        return reply
+
+    def pipeline(self, transaction: bool = True,
+                 shard_hint: Optional[str] = None) -> Any:
+        """
+        Returns a pipeline whose execution is recorded as one MULTI or
+        PIPELINE command, with the errors of its commands under their own
+        names.
+        """
+        pipe = super().pipeline(transaction=transaction,
+                                shard_hint=shard_hint)
+        execute = pipe.execute
+        metrics = self.metrics
+        name = "MULTI" if transaction else "PIPELINE"
+
+        def timed_execute(raise_on_error: bool = True) -> List[Any]:
+            """
+            Executes the pipeline and records its metrics.
+            """
+            commands = [str(args[0]).upper() for args, _ in
+                        pipe.command_stack]
+            request_bytes = sum(_size(args[1:]) for args, _ in
+                                pipe.command_stack)
+            start = time.perf_counter()
+            try:
+                results = execute(raise_on_error=raise_on_error)
+            except Exception as error:
+                metrics.record_error(name, error)
+                raise
+            metrics.record_command(name, time.perf_counter() - start,
+                                   request_bytes, _size([
+                                       result for result in results
+                                       if not isinstance(result, Exception)
+                                   ]))
+            for command, result in zip(commands, results):
+                if isinstance(result, Exception):
+                    metrics.record_error(command, result)
+            return results
+
+        pipe.execute = timed_execute
+        return pipe
+
+
+def _labels(**labels: str) -> str:
+    """
+    Formats Prometheus labels, escaping their values.
+    """
+    return ','.join('{}="{}"'.format(
+        name, value.replace('\\', '\\\\').replace('"', '\\"')
+        .replace('\n', '\\n')) for name, value in labels.items())
+
+
+def prometheus_text(metrics: Metrics, prefix: str = "redis_cache") -> str:
+    """
+    Dumps metrics in the Prometheus text exposition format.
+
+    Latencies and sizes are exposed as summaries (quantiles, sum and
+    count), latencies in seconds and sizes in bytes, and errors as a
+    counter.
+
+    Args:
+        metrics (Metrics): The metrics to dump.
+        prefix (str): The prefix of the metric names.
+
+    Returns:
+        str: The exposition text, ending with a newline.
+    """
+    snapshot = metrics.snapshot()
+    lines: List[str] = []
+    families = (
+        ('command_duration_seconds', 'commands', 'command', 1e-6,
+         "Latency of Redis commands and pipelines."),
+        ('method_duration_seconds', 'methods', 'method', 1e-6,
+         "Latency of Cache methods, Redis included."),
+        ('request_size_bytes', 'request_bytes', 'command', 1,
+         "Size of the arguments sent per command."),
+        ('response_size_bytes', 'response_bytes', 'command', 1,
+         "Size of the replies received per command."),
+    )
+    for name, key, label, scale, help_text in families:
+        metric = f"{prefix}_{name}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} summary")
+        for value, summary in sorted(snapshot[key].items()):
+            for q, quantile in summary['quantiles'].items():
+                labels = _labels(**{label: value, 'quantile': str(q)})
+                lines.append(f"{metric}{{{labels}}} {quantile * scale:g}")
+            labels = _labels(**{label: value})
+            lines.append(f"{metric}_sum{{{labels}}} "
+                         f"{summary['sum'] * scale:g}")
+            lines.append(f"{metric}_count{{{labels}}} {summary['count']}")
+    metric = f"{prefix}_errors_total"
+    lines.append(f"# HELP {metric} Errors of Redis commands.")
+    lines.append(f"# TYPE {metric} counter")
+    for key, count in sorted(snapshot['errors'].items()):
+        command, error = key.split(':', 1)
+        lines.append(f"{metric}{{{_labels(command=command, error=error)}}} "
+                     f"{count}")
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Module for implementing a compact tagged serialization of Cache values.
+"""
+import struct
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+# Every serialized value starts with MAGIC, the VERSION of the format and
+# a flags byte: the codec in the high nibble and the compression in the
+# low nibble. Bytes without this header decode as themselves.
+MAGIC = b'\xfeRCS'
+VERSION = 1
+HEADER_SIZE = len(MAGIC) + 2
+CODEC_TAGGED = 0
+CODEC_MSGPACK = 1
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_LZ4 = 2
+
+# msgpack extension types of tuples, which msgpack would turn into lists,
+# and of integers too large for its 64-bit ones.
+_TUPLE_EXT = 1
+_BIGINT_EXT = 2
+
+_DOUBLE = struct.Struct('>d')
+
+# Values of the tags without content: N, T and F.
+_CONSTANTS: Dict[int, Any] = {0x4e: None, 0x54: True, 0x46: False}
+
+
+def _write_size(out: bytearray, size: int) -> None:
+    """
+    Appends an unsigned integer as a little-endian base-128 varint.
+
+    Args:
+        out (bytearray): The buffer of the encoded value.
+        size (int): The integer to write, at least 0.
+    """
+    while size >= 0x80:
+        out.append((size & 0x7f) | 0x80)
+        size >>= 7
+    out.append(size)
+
+
+def _read_size(data: bytes, position: int) -> Tuple[int, int]:
+    """
+    Reads a varint written by _write_size.
+
+    Args:
+        data (bytes): The encoded value.
+        position (int): The position of the varint.
+
+    Returns:
+        Tuple[int, int]: The integer and the position after it.
+    """
+    size = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        size |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return size, position
+        shift += 7
+
+
+def _encode_tagged(value: Any, out: bytearray) -> None:
+    """
+    Appends the tagged encoding of a value: one type tag byte, then a
+    varint length or count where the type needs one, then the content.
+
+    Args:
+        value: The value to encode; None, bool, int, float, str, bytes,
+            and lists, tuples and dicts of those.
+        out (bytearray): The buffer of the encoded value.
+    """
+    if value is None:
+        out += b'N'
+    elif value is True:
+        out += b'T'
+    elif value is False:
+        out += b'F'
+    elif isinstance(value, int):
+        # Zigzag, so that small negative numbers stay short
+        out += b'i'
+        _write_size(out, value * 2 if value >= 0 else -value * 2 - 1)
+    elif isinstance(value, float):
+        out += b'f'
+        out += _DOUBLE.pack(value)
+    elif isinstance(value, str):
+        data = value.encode('utf-8')
+        out += b's'
+        _write_size(out, len(data))
+        out += data
+    elif isinstance(value, (bytes, bytearray)):
+        out += b'b'
+        _write_size(out, len(value))
+        out += value
+    elif isinstance(value, (list, tuple)):
+        out += b'l' if isinstance(value, list) else b't'
+        _write_size(out, len(value))
+        for item in value:
+            _encode_tagged(item, out)
+    elif isinstance(value, dict):
+        out += b'd'
+        _write_size(out, len(value))
+        for key, item in value.items():
+            _encode_tagged(key, out)
+            _encode_tagged(item, out)
+    else:
+        raise TypeError(
+            f"Cannot serialize a value of type {type(value).__name__}"
+        )
+
+
+def _decode_tagged(data: bytes, position: int) -> Tuple[Any, int]:
+    """
+    Reads a value written by _encode_tagged.
+
+    Args:
+        data (bytes): The encoded value.
+        position (int): The position of its tag byte.
+
+    Returns:
+        Tuple[Any, int]: The value and the position after it.
+    """
+    tag = data[position]
+    position += 1
+    if tag == 0x69:  # i
+        zigzag = data[position]
+        if zigzag < 0x80:
+            position += 1
+        else:
+            zigzag, position = _read_size(data, position)
+        return (zigzag >> 1) ^ -(zigzag & 1), position
+    if tag in (0x73, 0x62):  # s, b
+        size, position = _read_size(data, position)
+        content = data[position:position + size]
+        if tag == 0x73:
+            return content.decode('utf-8'), position + size
+        return bytes(content), position + size
+    if tag == 0x66:  # f
+        return _DOUBLE.unpack_from(data, position)[0], position + 8
+    if tag in (0x6c, 0x74):  # l, t
+        count, position = _read_size(data, position)
+        items = [None] * count
+        for index in range(count):
+            items[index], position = _decode_tagged(data, position)
+        return (items if tag == 0x6c else tuple(items)), position
+    if tag == 0x64:  # d
+        count, position = _read_size(data, position)
+        mapping: Dict[Any, Any] = {}
+        for _ in range(count):
+            key, position = _decode_tagged(data, position)
+            mapping[key], position = _decode_tagged(data, position)
+        return mapping, position
+    if tag in _CONSTANTS:
+        return _CONSTANTS[tag], position
+    raise ValueError(f"Unknown type tag {tag!r} at {position - 1}")
+
+
+def _msgpack_default(value: Any) -> Any:
+    """
+    Encodes the values msgpack does not keep as they are.
+
+    Args:
+        value: The value msgpack could not pack with strict types.
+    """
+    if isinstance(value, tuple):
+        return msgpack.ExtType(_TUPLE_EXT, _pack(list(value)))
+    if isinstance(value, int):
+        return msgpack.ExtType(_BIGINT_EXT, value.to_bytes(
+            (value.bit_length() + 8) // 8, 'big', signed=True
+        ))
+    if isinstance(value, bytearray):
+        return bytes(value)
+    raise TypeError(
+        f"Cannot serialize a value of type {type(value).__name__}"
+    )
+
+
+def _msgpack_ext_hook(code: int, data: bytes) -> Any:
+    """
+    Decodes the extension types written by _msgpack_default.
+
+    Args:
+        code (int): The extension type.
+        data (bytes): The packed content.
+    """
+    if code == _TUPLE_EXT:
+        return tuple(_unpack(data))
+    if code == _BIGINT_EXT:
+        return int.from_bytes(data, 'big', signed=True)
+    return msgpack.ExtType(code, data)
+
+
+def _pack(value: Any) -> bytes:
+    """
+    Packs a value with msgpack, keeping tuples apart from lists.
+    """
+    return msgpack.packb(value, use_bin_type=True, strict_types=True,
+                         default=_msgpack_default)
+
+
+def _unpack(data: bytes) -> Any:
+    """
+    Unpacks a value packed by _pack.
+    """
+    return msgpack.unpackb(data, raw=False, strict_map_key=False,
+                           ext_hook=_msgpack_ext_hook)
+
+
+class Serializer:
+    """
+    A tagged binary serialization of the values stored by Cache.
+
+    Values keep their type through a round trip: None, bool, int, float,
+    str, bytes, and lists, tuples and dicts of those. They are encoded
+    with msgpack when it is installed, or with a built-in msgpack-style
+    tagged format otherwise, and compressed with zlib or lz4 when the
+    encoding is at least compress_threshold bytes and compression saves
+    space. The header records the codec and compression, so any
+    Serializer decodes what another one encoded, provided it has the
+    needed libraries.
+    """
+    def __init__(self, codec: Optional[str] = None,
+                 compression: str = "zlib",
+                 compress_threshold: int = 1024) -> None:
+        """
+        Initializes the serializer.
+
+        Args:
+            codec (Optional[str]): "msgpack" or "tagged". Defaults to
+                msgpack when it is installed.
+            compression (str): "zlib", "lz4" or "none".
+            compress_threshold (int): The encoded size from which values
+                are compressed.
+        """
+        if codec is None:
+            codec = "msgpack" if msgpack is not None else "tagged"
+        if codec not in ("msgpack", "tagged"):
+            raise ValueError("codec must be 'msgpack' or 'tagged'")
+        if codec == "msgpack" and msgpack is None:
+            raise ValueError("the msgpack codec needs the msgpack package")
+        if compression not in ("zlib", "lz4", "none"):
+            raise ValueError("compression must be 'zlib', 'lz4' or 'none'")
+        if compression == "lz4" and lz4 is None:
+            raise ValueError("lz4 compression needs the lz4 package")
+        self.codec: int = (CODEC_MSGPACK if codec == "msgpack"
+                           else CODEC_TAGGED)
+        self.compression: int = {
+            "none": COMPRESSION_NONE,
+            "zlib": COMPRESSION_ZLIB,
+            "lz4": COMPRESSION_LZ4,
+        }[compression]
+        self.compress_threshold: int = compress_threshold
+
+    def encode(self, value: Any) -> bytes:
+        """
+        Serializes a value.
+
+        Args:
+            value: The value to serialize.
+
+        Returns:
+            bytes: The header, then the encoded value.
+        """
+        if self.codec == CODEC_MSGPACK:
+            payload = _pack(value)
+        else:
+            out = bytearray()
+            _encode_tagged(value, out)
+            payload = bytes(out)
+        compression = COMPRESSION_NONE
+        if (self.compression != COMPRESSION_NONE and
+                len(payload) >= self.compress_threshold):
+            compressed = _COMPRESSORS[self.compression](payload)
+            if len(compressed) < len(payload):
+                payload, compression = compressed, self.compression
+        return MAGIC + bytes((VERSION, (self.codec << 4) | compression)) + \
+            payload
+
+    def decode(self, data: bytes) -> Any:
+        """
+        Deserializes a value.
+
+        Args:
+            data (bytes): The bytes read from Redis.
+
+        Returns:
+            The original value, or data itself when it does not start
+            with a Serializer header (e.g. written by Cache without one).
+
+        Raises:
+            ValueError: If a value with a header cannot be decoded.
+        """
+        flags = data[HEADER_SIZE - 1] if len(data) >= HEADER_SIZE else 0
+        codec, compression = flags >> 4, flags & 0x0f
+        if len(data) < HEADER_SIZE or \
+           not data.startswith(MAGIC) or \
+           data[len(MAGIC)] != VERSION or \
+           codec not in (CODEC_MSGPACK, CODEC_TAGGED) or \
+           compression not in (COMPRESSION_NONE, COMPRESSION_ZLIB,
+                               COMPRESSION_LZ4):
+            return data
+        if compression != COMPRESSION_NONE and \
+           compression not in _DECOMPRESSORS:
+            raise ValueError("decoding this value needs lz4")
+        if codec == CODEC_MSGPACK and msgpack is None:
+            raise ValueError("decoding this value needs msgpack")
+        try:
+            payload = data[HEADER_SIZE:]
+            if compression != COMPRESSION_NONE:
+                payload = _DECOMPRESSORS[compression](payload)
+            if codec == CODEC_MSGPACK:
+                return _unpack(payload)
+            value, end = _decode_tagged(payload, 0)
+            if end != len(payload):
+                raise ValueError(f"{len(payload) - end} trailing bytes")
+            return value
+        except _DECODE_ERRORS as error:
+            # A truncated or corrupted value fails in the decompressor or
+            # the decoder with their own exceptions; callers get one type
+            raise ValueError(f"Corrupt serialized value: {error!r}") \
+                from error
+
+
+_COMPRESSORS: Dict[int, Callable[[bytes], bytes]] = {
+    COMPRESSION_ZLIB: zlib.compress,
+}
+_DECOMPRESSORS: Dict[int, Callable[[bytes], bytes]] = {
+    COMPRESSION_ZLIB: zlib.decompress,
+}
+# What decompressing and decoding a corrupted payload may raise; lz4
+# raises RuntimeError, and msgpack's errors derive from ValueError.
+_DECODE_ERRORS = (ValueError, IndexError, KeyError, TypeError,
+                  OverflowError, RuntimeError, struct.error, zlib.error)
+if lz4 is not None:
+    _COMPRESSORS[COMPRESSION_LZ4] = lz4.frame.compress
+    _DECOMPRESSORS[COMPRESSION_LZ4] = lz4.frame.decompress
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Concurrent stress check of the Cache.store call history.
+
+Several threads store distinct values through their own Cache instances,
+with synchronous and asynchronous bookkeeping, and every tenth store is
+followed by one that raises, then every history entry is checked: its
+output key must hold the value of its input, the lists must only hold
+the successful stores, and the call count must include the failed ones.
+
+It runs against a local redis-server, or fakeredis when no server
+answers.
+
+Usage: ./stress_history.py [threads] [stores per thread]
+"""
+import ast
+import sys
+import threading
+from typing import List
+
+import redis
+
+exercise = __import__('exercise')
+Serializer = __import__('serializer').Serializer
+connection_pool = __import__('bench_store').connection_pool
+
+
+def worker(pool: redis.ConnectionPool, thread: int, stores: int,
+           async_bookkeeping: bool, barrier: threading.Barrier) -> None:
+    """
+    Stores values tagged with the thread number, half of them with
+    store_many, and every tenth store one value the serializer rejects.
+
+    Args:
+        pool (redis.ConnectionPool): The shared connection pool.
+        thread (int): The number of the thread.
+        stores (int): The number of values to store.
+        async_bookkeeping (bool): Whether the Cache batches bookkeeping.
+        barrier (threading.Barrier): Starts the threads together.
+    """
+    cache = exercise.Cache(pool=pool, async_bookkeeping=async_bookkeeping,
+                           serializer=Serializer())
+    barrier.wait()
+    half = stores // 2
+    for i in range(half):
+        cache.store(f"{thread}-{i}")
+        if i % 10 == 0:
+            try:
+                cache.store(object())
+            except TypeError:
+                pass
+    cache.store_many((f"{thread}-{i}" for i in range(half, stores)),
+                     chunk_size=7)
+    cache.close()
+
+
+def check(client: redis.Redis, expected: int, failed: int) -> List[str]:
+    """
+    Checks that the history of Cache.store is complete and paired.
+
+    Args:
+        client (redis.Redis): The Redis client.
+        expected (int): The number of successful stores.
+        failed (int): The number of stores that raised.
+
+    Returns:
+        List[str]: The problems found; empty when the history is sound.
+    """
+    problems = []
+    count = int(client.get("Cache.store") or 0)
+    lengths = (client.llen("Cache.store:inputs"),
+               client.llen("Cache.store:outputs"))
+    if count != expected + failed or lengths != (expected, expected):
+        problems.append(f"count {count} and lengths {lengths}, "
+                        f"expected {expected + failed} and {expected}")
+    serializer = Serializer()
+    for index, input_bytes, output_bytes, _ in exercise.iter_history(
+            client, "Cache.store"):
+        try:
+            value = ast.literal_eval(input_bytes.decode('utf-8'))[0]
+        except (SyntaxError, ValueError):
+            problems.append(f"entry {index}: input {input_bytes!r} of a "
+                            f"failed store")
+            continue
+        stored = client.get(output_bytes)
+        if stored is not None:
+            stored = serializer.decode(stored)
+        if stored != value:
+            problems.append(f"entry {index}: input {value!r} but "
+                            f"{output_bytes!r} holds {stored!r}")
+    return problems
+
+
+def main() -> None:
+    """
+    Runs the stress check in both bookkeeping modes and prints the result.
+    """
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    stores = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    backend, pool = connection_pool()
+    client = redis.Redis(connection_pool=pool)
+    failed = False
+    for async_bookkeeping in (False, True):
+        client.flushdb()
+        barrier = threading.Barrier(threads)
+        workers = [threading.Thread(target=worker,
+                                    args=(pool, thread, stores,
+                                          async_bookkeeping, barrier))
+                   for thread in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        problems = check(client, threads * stores,
+                         threads * len(range(0, stores // 2, 10)))
+        mode = "async" if async_bookkeeping else "pipelined"
+        print(f"{mode:>10}: {threads} threads x {stores} stores against "
+              f"{backend}: {'OK' if not problems else 'FAILED'}")
+        for problem in problems[:10]:
+            print(f"{'':>12}{problem}")
+        failed = failed or bool(problems)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Module for implementing a Redis-backed page cache and a sliding-window
+rate limiter.
+"""
+import time
+import urllib.request
+import uuid
+from typing import Optional, Tuple
+
+import redis
+
+exercise = __import__('exercise')
+
+# Counts the access and returns the cached page, in one round trip.
+# KEYS: count:{url}, cached:{url}
+LOOKUP_SCRIPT = """
+redis.call('INCR', KEYS[1])
+return redis.call('GET', KEYS[2])
+"""
+
+# Sliding-window log: a sorted set of the request times of the window.
+# KEYS: the limiter key. ARGV: limit, window in ms, unique member.
+# Returns {allowed, remaining, retry after in ms}.
+RATE_LIMIT_SCRIPT = """
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now_ms - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count < limit then
+    redis.call('ZADD', KEYS[1], now_ms, ARGV[3])
+    redis.call('PEXPIRE', KEYS[1], window)
+    return {1, limit - count - 1, 0}
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+return {0, 0, tonumber(oldest[2]) + window - now_ms}
+"""
+
+# The client of the module, on the connection pool shared with Cache.
+_redis: redis.Redis = redis.Redis(connection_pool=exercise.shared_pool())
+# The scripts are sent with EVALSHA, and loaded again if the server lost
+# them.
+_lookup = _redis.register_script(LOOKUP_SCRIPT)
+_rate_limit = _redis.register_script(RATE_LIMIT_SCRIPT)
+
+
+def get_page(url: str, expiration: int = 10,
+             client: Optional[redis.Redis] = None) -> str:
+    """
+    Returns the HTML content of a URL, cached in Redis.
+
+    Every call increments count:{url}. The page is cached under
+    cached:{url} for `expiration` seconds; the count and the cache lookup
+    are one Lua script, so a cached page costs one round trip, and a miss
+    one more to cache what was fetched.
+
+    Args:
+        url (str): The URL of the page.
+        expiration (int): The number of seconds the page stays cached.
+        client (Optional[redis.Redis]): The Redis client to use instead
+            of the module's one.
+
+    Returns:
+        str: The content of the page.
+    """
+    client = client or _redis
+    cached_key = f"cached:{url}"
+    page = _lookup(keys=[f"count:{url}", cached_key], client=client)
+    if page is not None:
+        return page.decode('utf-8')
+    with urllib.request.urlopen(url) as response:
+        content = response.read().decode('utf-8')
+    client.setex(cached_key, expiration, content)
+    return content
+
+
+class RateLimiter:
+    """
+    A sliding-window rate limiter shared by every client of a Redis
+    server.
+
+    Each key allows `limit` requests in any window of `window` seconds.
+    The times of the requests of the window are kept in a sorted set, and
+    the whole check is one Lua script, so a check costs one round trip
+    and is atomic whatever the number of clients. Times come from the
+    Redis server, so the clocks of the clients do not matter.
+    """
+    def __init__(self, limit: int, window: float,
+                 client: Optional[redis.Redis] = None,
+                 prefix: str = "ratelimit:") -> None:
+        """
+        Initializes the rate limiter.
+
+        Args:
+            limit (int): The number of requests allowed per window.
+            window (float): The length of the window, in seconds.
+            client (Optional[redis.Redis]): The Redis client to use
+                instead of the module's one.
+            prefix (str): The prefix of the Redis keys of the limiter.
+        """
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        if window <= 0:
+            raise ValueError("window must be positive")
+        self.limit: int = limit
+        self.window_ms: int = max(1, int(window * 1000))
+        self.prefix: str = prefix
+        self._redis: redis.Redis = client or _redis
+
+    def hit(self, key: str) -> Tuple[bool, int, float]:
+        """
+        Counts a request against a key, if the key has room for it.
+
+        Args:
+            key (str): The key limited, e.g. a user or an IP address.
+
+        Returns:
+            Tuple[bool, int, float]: Whether the request is allowed, the
+            number of requests left in the window, and the number of
+            seconds to wait before the next one is allowed when it is
+            not.
+        """
+        allowed, remaining, retry_after = _rate_limit(
+            keys=[self.prefix + key],
+            args=[self.limit, self.window_ms, str(uuid.uuid4())],
+            client=self._redis
+        )
+        return bool(allowed), remaining, max(0, retry_after) / 1000
+
+    def wait(self, key: str) -> None:
+        """
+        Blocks until a request against a key is allowed, and counts it.
+
+        Args:
+            key (str): The key limited.
+        """
+        while True:
+            allowed, _, retry_after = self.hit(key)
+            if allowed:
+                return
+            time.sleep(retry_after)
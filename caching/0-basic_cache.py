@@ -3,28 +3,55 @@
 A module that defines a basic caching system.
 """
 
-BaseCaching = __import__('base_caching').BaseCaching
+import math
+PolicyCaching = __import__('policy_caching').PolicyCaching
 
 
-class BasicCache(BaseCaching):
+class BasicCache(PolicyCaching):
     """
-    A basic caching system that inherits from BaseCaching.
+    A basic caching system that inherits from PolicyCaching.
 
-    This caching system has no limit on the number of items it can store.
+    By default this caching system has no limit on the number of items it
+    can store. Given a capacity, it has no replacement policy to make room
+    and simply does not cache items that would exceed it.
     """
 
-    def put(self, key, item):
+    def __init__(self, capacity=None, weigher=None, ttl=None):
+        """
+        Initializes the cache.
+
+        Args:
+            capacity: The maximum total weight of the cache. Defaults to
+                      no limit.
+            weigher: An optional callable returning the weight of an item.
+            ttl: The default number of seconds before an item expires.
+                 Defaults to never.
+        """
+        super().__init__(math.inf if capacity is None else capacity, weigher,
+                         ttl)
+
+    def put(self, key, item, ttl=None):
         """
         Assigns an item to the cache dictionary.
 
-        This method does nothing if the key or item is None.
+        This method does nothing if the key or item is None. An item that
+        does not fit in the remaining capacity is not cached, and replaces
+        any previous value of the key.
 
         Args:
             key: The key for the item to be stored.
             item: The value of the item to be stored.
+            ttl: The number of seconds before the item expires. Defaults
+                 to the ttl of the cache.
         """
-        if key is not None and item is not None:
-            self.cache_data[key] = item
+        if key is None or item is None:
+            return
+
+        weight = self._weigh(item)
+        if not self._needs_room(key, weight):
+            self._store(key, item, weight, ttl)
+        elif key in self.cache_data:
+            self._remove(key)
 
     def get(self, key):
         """
@@ -34,9 +61,9 @@ class BasicCache(BaseCaching):
             key: The key of the item to retrieve.
 
         Returns:
-            The value associated with the key, or None if the key is None
-            or if the key does not exist in the cache.
+            The value associated with the key, or None if the key is None,
+            if the key does not exist in the cache or if it has expired.
         """
-        if key is None:
-            return None
-        return self.cache_data.get(key)
+        if key is None or self._expired(key):
+            return self._tally(None)
+        return self._tally(self.cache_data.get(key))
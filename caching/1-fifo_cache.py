@@ -3,24 +3,31 @@
 A module that defines a FIFO caching system.
 """
 
-BaseCaching = __import__('base_caching').BaseCaching
+PolicyCaching = __import__('policy_caching').PolicyCaching
 
 
-class FIFOCache(BaseCaching):
+class FIFOCache(PolicyCaching):
     """
     A FIFO (First-In, First-Out) caching system that inherits from
-    BaseCaching.
+    PolicyCaching.
 
-    It discards the oldest item when the cache reaches its maximum size.
+    It discards the oldest item when the cache reaches its capacity.
     """
 
-    def __init__(self):
+    def __init__(self, capacity=None, weigher=None, ttl=None):
         """
         Initializes the cache.
+
+        Args:
+            capacity: The maximum total weight of the cache. Defaults to
+                      BaseCaching.MAX_ITEMS.
+            weigher: An optional callable returning the weight of an item.
+            ttl: The default number of seconds before an item expires.
+                 Defaults to never.
         """
-        super().__init__()
+        super().__init__(capacity, weigher, ttl)
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """
         Assigns an item to the cache dictionary.
 
@@ -29,20 +36,24 @@ class FIFOCache(BaseCaching):
         Args:
             key: The key for the item to be stored.
             item: The value of the item to be stored.
+            ttl: The number of seconds before the item expires. Defaults
+                 to the ttl of the cache.
         """
         if key is None or item is None:
             return
 
-        # Add item to the cache
-        self.cache_data[key] = item
+        weight = self._weigh(item)
+        if self._make_room(key, weight):
+            self._store(key, item, weight, ttl)
+
+    def _victim(self, key):
+        """
+        Chooses the first item added as the next one to evict.
 
-        # Check if cache size exceeds the limit
-        if len(self.cache_data) > BaseCaching.MAX_ITEMS:
-            # Get the first key inserted (oldest item)
-            first_key = next(iter(self.cache_data))
-            print(f"DISCARD: {first_key}")
-            # Remove the oldest item from the cache
-            del self.cache_data[first_key]
+        Args:
+            key: The key being stored, which must not be chosen.
+        """
+        return next(k for k in self.cache_data if k != key)
 
     def get(self, key):
         """
@@ -52,9 +63,9 @@ class FIFOCache(BaseCaching):
             key: The key of the item to retrieve.
 
         Returns:
-            The value associated with the key, or None if the key is None
-            or if the key does not exist in the cache.
+            The value associated with the key, or None if the key is None,
+            if the key does not exist in the cache or if it has expired.
         """
-        if key is None:
-            return None
-        return self.cache_data.get(key)
+        if key is None or self._expired(key):
+            return self._tally(None)
+        return self._tally(self.cache_data.get(key))
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+A module that defines a memory-compact LRU caching system.
+"""
+
+from array import array
+BaseCaching = __import__('base_caching').BaseCaching
+print_discard = __import__('policy_caching').print_discard
+
+
+class CompactLRUCache(BaseCaching):
+    """
+    A LRU (Least Recently Used) caching system that inherits from
+    BaseCaching and stores its items in preallocated slots.
+
+    Keys, items and key hashes live in flat lists and arrays indexed by
+    slot, the recency list is a pair of int arrays (prev/next slot), and
+    keys are found through an open-addressing table of slot numbers. No
+    Python object is allocated per item, so an entry costs about 40 bytes
+    of bookkeeping instead of the dict plus OrderedDict node of LRUCache.
+
+    The capacity is a number of items fixed at creation. cache_data is
+    rebuilt on each access from the slots, in LRU order, so it is meant
+    for inspection (e.g. print_cache), not for the hot path.
+    """
+
+    def __init__(self, capacity=None):
+        """
+        Initializes the cache and preallocates its slots.
+
+        Args:
+            capacity (int): The maximum number of items of the cache.
+                            Defaults to BaseCaching.MAX_ITEMS.
+        """
+        if capacity is None:
+            capacity = BaseCaching.MAX_ITEMS
+        if not isinstance(capacity, int) or capacity <= 0:
+            raise ValueError("capacity must be a positive integer")
+        self.capacity = capacity
+        table_size = 1
+        while table_size < 2 * capacity:
+            table_size *= 2
+        self._mask = table_size - 1
+        self._table = array('i', [-1]) * table_size
+        self._keys = [None] * capacity
+        self._items = [None] * capacity
+        self._hashes = array('q', [0]) * capacity
+        self._prev = array('i', [-1]) * capacity
+        self._next = array('i', [-1]) * capacity
+        self._head = -1
+        self._tail = -1
+        self._size = 0
+        self.listeners = [print_discard]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        super().__init__()
+
+    @property
+    def cache_data(self):
+        """
+        Returns a dictionary of the items, from least to most recently
+        used.
+        """
+        data = {}
+        slot = self._head
+        while slot >= 0:
+            data[self._keys[slot]] = self._items[slot]
+            slot = self._next[slot]
+        return data
+
+    @cache_data.setter
+    def cache_data(self, data):
+        """
+        Empties the cache, then puts the items of a dictionary in it.
+
+        Args:
+            data (dict): The items to load.
+        """
+        self._table[:] = array('i', [-1]) * len(self._table)
+        self._keys[:] = [None] * self.capacity
+        self._items[:] = [None] * self.capacity
+        self._head = self._tail = -1
+        self._size = 0
+        for key, item in data.items():
+            self.put(key, item)
+
+    def _find(self, key, key_hash):
+        """
+        Looks a key up in the open-addressing table.
+
+        Args:
+            key: The key to look up.
+            key_hash (int): The hash of the key.
+
+        Returns:
+            tuple: The position of the key in the table, or of the free
+            position where it would go, and its slot, or -1 if absent.
+        """
+        table, hashes, keys = self._table, self._hashes, self._keys
+        mask = self._mask
+        position = key_hash & mask
+        while True:
+            slot = table[position]
+            if slot < 0:
+                return position, -1
+            if hashes[slot] == key_hash and (keys[slot] is key or
+                                             keys[slot] == key):
+                return position, slot
+            position = (position + 1) & mask
+
+    def _unindex(self, position):
+        """
+        Frees a position of the table, shifting back the entries that
+        probed past it so that lookups never need tombstones.
+
+        Args:
+            position (int): The position to free.
+        """
+        table, hashes, mask = self._table, self._hashes, self._mask
+        hole = position
+        while True:
+            position = (position + 1) & mask
+            slot = table[position]
+            if slot < 0:
+                break
+            home = hashes[slot] & mask
+            if hole <= position:
+                stays = hole < home <= position
+            else:
+                stays = home > hole or home <= position
+            if not stays:
+                table[hole] = slot
+                hole = position
+        table[hole] = -1
+
+    def _unlink(self, slot):
+        """
+        Removes a slot from the recency list.
+
+        Args:
+            slot (int): The slot to remove.
+        """
+        prev_slot, next_slot = self._prev[slot], self._next[slot]
+        if prev_slot >= 0:
+            self._next[prev_slot] = next_slot
+        else:
+            self._head = next_slot
+        if next_slot >= 0:
+            self._prev[next_slot] = prev_slot
+        else:
+            self._tail = prev_slot
+
+    def _append(self, slot):
+        """
+        Adds a slot at the most recently used end of the recency list.
+
+        Args:
+            slot (int): The slot to add.
+        """
+        self._prev[slot] = self._tail
+        self._next[slot] = -1
+        if self._tail >= 0:
+            self._next[self._tail] = slot
+        else:
+            self._head = slot
+        self._tail = slot
+
+    def put(self, key, item):
+        """
+        Assigns an item to the cache.
+
+        If the cache is full, it discards the least recently used item.
+
+        Args:
+            key: The key for the item to be stored.
+            item: The value of the item to be stored.
+        """
+        if key is None or item is None:
+            return
+
+        key_hash = hash(key)
+        position, slot = self._find(key, key_hash)
+        if slot >= 0:
+            self._items[slot] = item
+            if slot != self._tail:
+                self._unlink(slot)
+                self._append(slot)
+            return
+
+        evicted = None
+        if self._size < self.capacity:
+            slot = self._size
+            self._size += 1
+        else:
+            slot = self._head
+            evicted = (self._keys[slot], self._items[slot])
+            self._unindex(self._find(evicted[0], self._hashes[slot])[0])
+            self._unlink(slot)
+            position, _ = self._find(key, key_hash)
+
+        self._keys[slot] = key
+        self._items[slot] = item
+        self._hashes[slot] = key_hash
+        self._table[position] = slot
+        self._append(slot)
+
+        if evicted is not None:
+            self.evictions += 1
+            for listener in self.listeners:
+                listener(*evicted)
+
+    def get(self, key):
+        """
+        Retrieves an item from the cache by its key.
+
+        Marks the retrieved item as the most recently used.
+
+        Args:
+            key: The key of the item to retrieve.
+
+        Returns:
+            The value associated with the key, or None if the key is None
+            or if the key does not exist in the cache.
+        """
+        if key is None:
+            return None
+        slot = self._find(key, hash(key))[1]
+        if slot < 0:
+            self.misses += 1
+            return None
+        if slot != self._tail:
+            self._unlink(slot)
+            self._append(slot)
+        self.hits += 1
+        return self._items[slot]
+
+    def __len__(self):
+        """
+        Returns the number of items in the cache.
+        """
+        return self._size
+
+    def add_listener(self, listener):
+        """
+        Registers a callable called with the key and item of every
+        eviction.
+
+        Args:
+            listener: The callable to register.
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """
+        Unregisters an eviction listener.
+
+        Args:
+            listener: The callable to unregister.
+        """
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def stats(self):
+        """
+        Returns the counters of the cache.
+
+        Returns:
+            dict: The number of items and the capacity, the hit, miss and
+            eviction counts, and the hit ratio of get calls.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'items': self._size,
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': self.hits / lookups if lookups else 0.0
+        }
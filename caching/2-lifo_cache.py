@@ -3,24 +3,31 @@
 A module that defines a LIFO caching system.
 """
 
-BaseCaching = __import__('base_caching').BaseCaching
+PolicyCaching = __import__('policy_caching').PolicyCaching
 
 
-class LIFOCache(BaseCaching):
+class LIFOCache(PolicyCaching):
     """
     A LIFO (Last-In, First-Out) caching system that inherits from
-    BaseCaching.
+    PolicyCaching.
 
     It discards the most recently added item when the cache is full.
     """
 
-    def __init__(self):
+    def __init__(self, capacity=None, weigher=None, ttl=None):
         """
         Initializes the cache.
+
+        Args:
+            capacity: The maximum total weight of the cache. Defaults to
+                      BaseCaching.MAX_ITEMS.
+            weigher: An optional callable returning the weight of an item.
+            ttl: The default number of seconds before an item expires.
+                 Defaults to never.
         """
-        super().__init__()
+        super().__init__(capacity, weigher, ttl)
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """
         Assigns an item to the cache dictionary.
 
@@ -29,17 +36,24 @@ class LIFOCache(BaseCaching):
         Args:
             key: The key for the item to be stored.
             item: The value of the item to be stored.
+            ttl: The number of seconds before the item expires. Defaults
+                 to the ttl of the cache.
         """
         if key is None or item is None:
             return
 
-        if len(self.cache_data) >= BaseCaching.MAX_ITEMS and \
-           key not in self.cache_data:
-            # Pop the last item added
-            last_key, _ = self.cache_data.popitem()
-            print(f"DISCARD: {last_key}")
+        weight = self._weigh(item)
+        if self._make_room(key, weight):
+            self._store(key, item, weight, ttl)
+
+    def _victim(self, key):
+        """
+        Chooses the last item added as the next one to evict.
 
-        self.cache_data[key] = item
+        Args:
+            key: The key being stored, which must not be chosen.
+        """
+        return next(k for k in reversed(self.cache_data) if k != key)
 
     def get(self, key):
         """
@@ -49,9 +63,9 @@ class LIFOCache(BaseCaching):
             key: The key of the item to retrieve.
 
         Returns:
-            The value associated with the key, or None if the key is None
-            or if the key does not exist in the cache.
+            The value associated with the key, or None if the key is None,
+            if the key does not exist in the cache or if it has expired.
         """
-        if key is None:
-            return None
-        return self.cache_data.get(key)
+        if key is None or self._expired(key):
+            return self._tally(None)
+        return self._tally(self.cache_data.get(key))
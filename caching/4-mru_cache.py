@@ -4,25 +4,32 @@ A module that defines a MRU caching system.
 """
 
 from collections import OrderedDict
-BaseCaching = __import__('base_caching').BaseCaching
+PolicyCaching = __import__('policy_caching').PolicyCaching
 
 
-class MRUCache(BaseCaching):
+class MRUCache(PolicyCaching):
     """
     A MRU (Most Recently Used) caching system that inherits from
-    BaseCaching.
+    PolicyCaching.
 
     It discards the most recently used item when the cache is full.
     """
 
-    def __init__(self):
+    def __init__(self, capacity=None, weigher=None, ttl=None):
         """
         Initializes the cache.
+
+        Args:
+            capacity: The maximum total weight of the cache. Defaults to
+                      BaseCaching.MAX_ITEMS.
+            weigher: An optional callable returning the weight of an item.
+            ttl: The default number of seconds before an item expires.
+                 Defaults to never.
         """
-        super().__init__()
+        super().__init__(capacity, weigher, ttl)
         self.cache_data = OrderedDict()
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """
         Assigns an item to the cache dictionary.
 
@@ -31,18 +38,25 @@ class MRUCache(BaseCaching):
         Args:
             key: The key for the item to be stored.
             item: The value of the item to be stored.
+            ttl: The number of seconds before the item expires. Defaults
+                 to the ttl of the cache.
         """
         if key is None or item is None:
             return
 
-        if key in self.cache_data:
+        weight = self._weigh(item)
+        if self._make_room(key, weight):
+            self._store(key, item, weight, ttl)
             self.cache_data.move_to_end(key)
-        
-        self.cache_data[key] = item
-        
-        if len(self.cache_data) > BaseCaching.MAX_ITEMS:
-            mru_key, _ = self.cache_data.popitem(last=True)
-            print(f"DISCARD: {mru_key}")
+
+    def _victim(self, key):
+        """
+        Chooses the most recently used item as the next one to evict.
+
+        Args:
+            key: The key being stored, which must not be chosen.
+        """
+        return next(k for k in reversed(self.cache_data) if k != key)
 
     def get(self, key):
         """
@@ -54,10 +68,11 @@ class MRUCache(BaseCaching):
             key: The key of the item to retrieve.
 
         Returns:
-            The value associated with the key, or None if the key is None
-            or if the key does not exist in the cache.
+            The value associated with the key, or None if the key is None,
+            if the key does not exist in the cache or if it has expired.
         """
-        if key is not None and key in self.cache_data:
+        if key is not None and key in self.cache_data and \
+           not self._expired(key):
             self.cache_data.move_to_end(key)
-            return self.cache_data[key]
-        return None
+            return self._tally(self.cache_data[key])
+        return self._tally(None)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+A module that defines a LFU caching system.
+"""
+
+from collections import OrderedDict
+PolicyCaching = __import__('policy_caching').PolicyCaching
+
+
+class LFUCache(PolicyCaching):
+    """
+    A LFU (Least Frequently Used) caching system that inherits from
+    PolicyCaching.
+
+    It discards the least frequently used item when the cache is full.
+    If several items share the lowest frequency, the least recently used
+    of them is discarded.
+
+    Keys are grouped into frequency buckets (an OrderedDict per use count,
+    ordered from least to most recently used), and the non-empty buckets
+    are linked in increasing frequency order, so put, get and every
+    eviction run in O(1) without scanning the cache or the frequencies.
+    """
+
+    def __init__(self, capacity=None, weigher=None, ttl=None):
+        """
+        Initializes the cache.
+
+        Args:
+            capacity: The maximum total weight of the cache. Defaults to
+                      BaseCaching.MAX_ITEMS.
+            weigher: An optional callable returning the weight of an item.
+            ttl: The default number of seconds before an item expires.
+                 Defaults to never.
+        """
+        super().__init__(capacity, weigher, ttl)
+        self.frequencies = {}
+        self.buckets = {}
+        # Doubly linked list of the frequencies of the buckets, with 0 as
+        # its sentinel: next_frequency[0] is the lowest one
+        self.next_frequency = {0: 0}
+        self.prev_frequency = {0: 0}
+        self.min_frequency = 0
+
+    def _add(self, key, frequency, after):
+        """
+        Appends a key to the bucket of a frequency, creating the bucket
+        right after the one of another frequency if needed.
+
+        Args:
+            key: The key to add.
+            frequency: The frequency of its bucket.
+            after: The highest frequency below it that has a bucket, or 0.
+        """
+        bucket = self.buckets.get(frequency)
+        if bucket is None:
+            bucket = self.buckets[frequency] = OrderedDict()
+            following = self.next_frequency[after]
+            self.next_frequency[after] = frequency
+            self.prev_frequency[frequency] = after
+            self.next_frequency[frequency] = following
+            self.prev_frequency[following] = frequency
+            self.min_frequency = self.next_frequency[0]
+        bucket[key] = None
+
+    def _discard_from_bucket(self, key, frequency):
+        """
+        Removes a key from the bucket of a frequency, unlinking the bucket
+        when it becomes empty.
+
+        Args:
+            key: The key to remove.
+            frequency: The frequency of its bucket.
+        """
+        bucket = self.buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[frequency]
+            before = self.prev_frequency.pop(frequency)
+            following = self.next_frequency.pop(frequency)
+            self.next_frequency[before] = following
+            self.prev_frequency[following] = before
+            self.min_frequency = self.next_frequency[0]
+
+    def _touch(self, key):
+        """
+        Moves a key from its frequency bucket to the next one.
+
+        Args:
+            key: The key that has just been used.
+        """
+        frequency = self.frequencies[key]
+        self.frequencies[key] = frequency + 1
+        # Added first, so the new bucket links right after the old one
+        self._add(key, frequency + 1, frequency)
+        self._discard_from_bucket(key, frequency)
+
+    def put(self, key, item, ttl=None):
+        """
+        Assigns an item to the cache dictionary.
+
+        If the cache is full, it discards the least frequently used item,
+        using the least recently used one to break ties.
+
+        Args:
+            key: The key for the item to be stored.
+            item: The value of the item to be stored.
+            ttl: The number of seconds before the item expires. Defaults
+                 to the ttl of the cache.
+        """
+        if key is None or item is None:
+            return
+
+        weight = self._weigh(item)
+        if key in self.cache_data:
+            self._touch(key)
+        if not self._make_room(key, weight):
+            return
+        if key not in self.frequencies:
+            self.frequencies[key] = 1
+            self._add(key, 1, 0)
+        self._store(key, item, weight, ttl)
+
+    def _victim(self, key):
+        """
+        Chooses the least recently used of the least frequently used
+        items as the next one to evict.
+
+        Args:
+            key: The key being stored, which must not be chosen.
+        """
+        victim = next(iter(self.buckets[self.min_frequency]))
+        if victim == key:
+            # The key was just touched, so it is alone in its bucket.
+            frequency = self.next_frequency[self.min_frequency]
+            victim = next(iter(self.buckets[frequency]))
+        return victim
+
+    def _remove(self, key):
+        """
+        Removes an item from the cache and from its frequency bucket.
+
+        Args:
+            key: The key of the item to remove.
+
+        Returns:
+            The removed item.
+        """
+        self._discard_from_bucket(key, self.frequencies.pop(key))
+        return super()._remove(key)
+
+    def get(self, key):
+        """
+        Retrieves an item from the cache by its key.
+
+        Increments the use count of the retrieved item.
+
+        Args:
+            key: The key of the item to retrieve.
+
+        Returns:
+            The value associated with the key, or None if the key is None,
+            if the key does not exist in the cache or if it has expired.
+        """
+        if key is not None and key in self.cache_data and \
+           not self._expired(key):
+            self._touch(key)
+            return self._tally(self.cache_data[key])
+        return self._tally(None)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+A module that defines a thread-safe, lock-striped caching system.
+"""
+
+import threading
+
+
+class ShardedCache():
+    """
+    A thread-safe caching system that partitions keys across several
+    independently locked caches.
+
+    Each key is routed to one shard by its hash, and only that shard's
+    lock is held while the item is read or written, so threads working
+    on different shards never wait for each other. Any BaseCaching
+    policy can be used for the shards; its replacement rules then apply
+    per shard.
+    """
+
+    def __init__(self, policy, shards=8, **policy_kwargs):
+        """
+        Initializes the cache.
+
+        Args:
+            policy: The caching class used for every shard
+                    (e.g. LRUCache).
+            shards (int): The number of shards, and therefore of locks.
+            **policy_kwargs: Keyword arguments forwarded to every shard.
+        """
+        if not isinstance(shards, int) or shards < 1:
+            raise ValueError("shards must be a positive integer")
+        self.shards = [policy(**policy_kwargs) for _ in range(shards)]
+        # Reuse the lock of PolicyCaching shards so that their reaper
+        # thread and the callers of this cache exclude each other.
+        self.locks = [getattr(shard, 'lock', None) or threading.Lock()
+                      for shard in self.shards]
+        self.hits = [0] * shards
+        self.misses = [0] * shards
+        self.puts = [0] * shards
+
+    def _shard_index(self, key):
+        """
+        Returns the index of the shard that owns a key.
+
+        Args:
+            key: The key to route.
+        """
+        return hash(key) % len(self.shards)
+
+    def put(self, key, item, ttl=None):
+        """
+        Assigns an item to the shard that owns its key.
+
+        This method does nothing if the key or item is None.
+
+        Args:
+            key: The key for the item to be stored.
+            item: The value of the item to be stored.
+            ttl: The number of seconds before the item expires, for
+                 policies that support expiry. Defaults to the ttl of
+                 the shard.
+        """
+        if key is None or item is None:
+            return
+        index = self._shard_index(key)
+        with self.locks[index]:
+            if ttl is None:
+                self.shards[index].put(key, item)
+            else:
+                self.shards[index].put(key, item, ttl)
+            self.puts[index] += 1
+
+    def get(self, key):
+        """
+        Retrieves an item from the shard that owns its key.
+
+        Args:
+            key: The key of the item to retrieve.
+
+        Returns:
+            The value associated with the key, or None if the key is None
+            or if the key does not exist in the cache.
+        """
+        if key is None:
+            return None
+        index = self._shard_index(key)
+        with self.locks[index]:
+            item = self.shards[index].get(key)
+            if item is None:
+                self.misses[index] += 1
+            else:
+                self.hits[index] += 1
+        return item
+
+    def start_reaper(self, interval=1.0):
+        """
+        Starts the background reaper of every shard.
+
+        Args:
+            interval (float): The number of seconds between two reaps.
+        """
+        for shard in self.shards:
+            shard.start_reaper(interval)
+
+    def stop_reaper(self):
+        """
+        Stops the background reaper of every shard.
+        """
+        for shard in self.shards:
+            shard.stop_reaper()
+
+    def add_listener(self, listener):
+        """
+        Registers an eviction listener on every shard. It is called while
+        the lock of the evicting shard is held.
+
+        Args:
+            listener: A callable taking the key and item of the eviction.
+        """
+        for shard in self.shards:
+            shard.add_listener(listener)
+
+    def remove_listener(self, listener):
+        """
+        Unregisters an eviction listener from every shard.
+
+        Args:
+            listener: The callable to unregister.
+        """
+        for shard in self.shards:
+            shard.remove_listener(listener)
+
+    def __len__(self):
+        """
+        Returns the number of items held by all the shards.
+        """
+        return sum(len(shard.cache_data) for shard in self.shards)
+
+    def stats(self):
+        """
+        Aggregates the counters of all the shards.
+
+        Returns:
+            dict: The number of shards and items, the hit, miss and put
+            counts, and the hit ratio of get calls. The eviction and
+            expiration counts are added for shards that keep them.
+        """
+        hits = sum(self.hits)
+        misses = sum(self.misses)
+        lookups = hits + misses
+        stats = {
+            'shards': len(self.shards),
+            'items': len(self),
+            'hits': hits,
+            'misses': misses,
+            'puts': sum(self.puts),
+            'hit_ratio': hits / lookups if lookups else 0.0
+        }
+        shard_stats = [shard.stats() for shard in self.shards
+                       if hasattr(shard, 'stats')]
+        if shard_stats:
+            for counter in ('evictions', 'expirations'):
+                stats[counter] = sum(s[counter] for s in shard_stats)
+        return stats
+
+    def print_cache(self):
+        """
+        Prints the items of all the shards, sorted by key.
+        """
+        items = {}
+        for index, shard in enumerate(self.shards):
+            with self.locks[index]:
+                items.update(shard.cache_data)
+        print("Current cache:")
+        for key in sorted(items.keys()):
+            print("{}: {}".format(key, items.get(key)))
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+A module that defines an ARC caching system.
+"""
+
+from collections import OrderedDict
+PolicyCaching = __import__('policy_caching').PolicyCaching
+
+
+class ARCCache(PolicyCaching):
+    """
+    An ARC (Adaptive Replacement Cache) caching system that inherits from
+    PolicyCaching.
+
+    Cached keys live in two LRU lists: t1 for keys seen once recently and
+    t2 for keys seen at least twice. Each list has a ghost list (b1, b2)
+    remembering the keys recently evicted from it, without their items.
+    A hit in a ghost list moves the target size of t1 towards the list
+    that would have kept the key, so a sequential scan only churns t1
+    and leaves the frequently used keys of t2 in place.
+    """
+
+    def __init__(self, capacity=None, weigher=None, ttl=None):
+        """
+        Initializes the cache.
+
+        Args:
+            capacity: The maximum number of items of the cache. Defaults
+                      to BaseCaching.MAX_ITEMS.
+            weigher: Not supported, ARC counts items.
+            ttl: The default number of seconds before an item expires.
+                 Defaults to never.
+        """
+        if weigher is not None:
+            raise ValueError("ARCCache counts items and takes no weigher")
+        super().__init__(capacity, None, ttl)
+        self.t1 = OrderedDict()
+        self.t2 = OrderedDict()
+        self.b1 = OrderedDict()
+        self.b2 = OrderedDict()
+        self.target = 0
+
+    def _replace(self, in_b2):
+        """
+        Evicts the least recently used key of t1 or t2 into its ghost list.
+
+        Args:
+            in_b2 (bool): Whether the key being stored was found in b2.
+        """
+        if self.t1 and (not self.t2 or len(self.t1) > self.target or
+                        (in_b2 and len(self.t1) == self.target)):
+            victim = next(iter(self.t1))
+            self.b1[victim] = None
+        else:
+            victim = next(iter(self.t2))
+            self.b2[victim] = None
+        self._discard(victim)
+
+    def put(self, key, item, ttl=None):
+        """
+        Assigns an item to the cache dictionary.
+
+        If the cache is full, it discards the least recently used item of
+        t1 or t2, depending on the adaptive target size of t1.
+
+        Args:
+            key: The key for the item to be stored.
+            item: The value of the item to be stored.
+            ttl: The number of seconds before the item expires. Defaults
+                 to the ttl of the cache.
+        """
+        if key is None or item is None:
+            return
+
+        capacity = self.capacity
+        full = len(self.cache_data) >= capacity
+        if key in self.cache_data:
+            self.t1.pop(key, None)
+            self.t2.pop(key, None)
+            self.t2[key] = None
+        elif key in self.b1:
+            step = max(len(self.b2) / len(self.b1), 1)
+            self.target = min(capacity, self.target + step)
+            if full:
+                self._replace(False)
+            del self.b1[key]
+            self.t2[key] = None
+        elif key in self.b2:
+            step = max(len(self.b1) / len(self.b2), 1)
+            self.target = max(0, self.target - step)
+            if full:
+                self._replace(True)
+            del self.b2[key]
+            self.t2[key] = None
+        else:
+            if len(self.t1) + len(self.b1) >= capacity:
+                if len(self.t1) < capacity:
+                    self.b1.popitem(last=False)
+                    if full:
+                        self._replace(False)
+                else:
+                    self._discard(next(iter(self.t1)))
+            else:
+                if self.b2 and (len(self.cache_data) + len(self.b1) +
+                                len(self.b2) >= 2 * capacity):
+                    self.b2.popitem(last=False)
+                if full:
+                    self._replace(False)
+            self.t1[key] = None
+        self._store(key, item, 1, ttl)
+
+    def _remove(self, key):
+        """
+        Removes an item from the cache and from t1 or t2.
+
+        Args:
+            key: The key of the item to remove.
+
+        Returns:
+            The removed item.
+        """
+        self.t1.pop(key, None)
+        self.t2.pop(key, None)
+        return super()._remove(key)
+
+    def get(self, key):
+        """
+        Retrieves an item from the cache by its key.
+
+        A hit moves the item to the most recently used end of t2.
+
+        Args:
+            key: The key of the item to retrieve.
+
+        Returns:
+            The value associated with the key, or None if the key is None,
+            if the key does not exist in the cache or if it has expired.
+        """
+        if key is not None and key in self.cache_data and \
+           not self._expired(key):
+            self.t1.pop(key, None)
+            self.t2.pop(key, None)
+            self.t2[key] = None
+            return self._tally(self.cache_data[key])
+        return self._tally(None)
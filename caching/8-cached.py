@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+A module that defines a memoizing decorator backed by the caching
+policies.
+"""
+
+import threading
+from functools import wraps
+
+LRUCache = __import__('3-lru_cache').LRUCache
+print_discard = __import__('policy_caching').print_discard
+
+_KWARGS_MARK = object()
+
+
+def make_key(args, kwargs):
+    """
+    Builds a hashable cache key from the arguments of a call.
+
+    Keyword arguments are sorted, so f(a=1, b=2) and f(b=2, a=1) share a
+    key. Unhashable arguments raise TypeError when the key is used.
+
+    Args:
+        args (tuple): The positional arguments of the call.
+        kwargs (dict): The keyword arguments of the call.
+
+    Returns:
+        tuple: The key of the call.
+    """
+    if not kwargs:
+        return args
+    return args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+
+
+class _Call():
+    """
+    A computation in flight, shared by the callers waiting for it.
+    """
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        """
+        Initializes the call.
+        """
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def cached(policy=LRUCache, capacity=None, ttl=None):
+    """
+    Memoizes a pure function in a cache of the given policy.
+
+    Concurrent calls with the same arguments are collapsed into a single
+    computation (single flight): the first caller computes the result and
+    the others wait for it. Results are boxed, so None is cached as well.
+    Exceptions are not cached; they are raised to every waiting caller.
+
+    The decorated function gains a cache attribute holding the cache, a
+    stats() function reporting hits, misses, collapsed calls and the hit
+    ratio, and a cache_clear() function.
+
+    Args:
+        policy: The caching class to use. Defaults to LRUCache.
+        capacity: The capacity of the cache. Defaults to the default of
+                  the policy.
+        ttl: The number of seconds a result stays valid. Defaults to
+             never.
+
+    Returns:
+        Callable: The decorator.
+    """
+    def decorator(fn):
+        """
+        Wraps a function with the cache.
+
+        Args:
+            fn (Callable): The function to memoize.
+
+        Returns:
+            Callable: The memoized function.
+        """
+        lock = threading.Lock()
+        in_flight = {}
+        counters = {'hits': 0, 'misses': 0, 'collapsed': 0}
+
+        def new_cache():
+            """
+            Builds an empty cache that does not print its evictions.
+            ttl is only passed when set, for policies without expiration
+            such as CompactLRUCache.
+            """
+            options = {'capacity': capacity}
+            if ttl is not None:
+                options['ttl'] = ttl
+            cache = policy(**options)
+            cache.remove_listener(print_discard)
+            return cache
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            """
+            Returns the cached result of the call, computing it once if
+            needed.
+            """
+            key = make_key(args, kwargs)
+            with lock:
+                box = wrapper.cache.get(key)
+                if box is not None:
+                    counters['hits'] += 1
+                    return box[0]
+                counters['misses'] += 1
+                call = in_flight.get(key)
+                leader = call is None
+                if leader:
+                    call = in_flight[key] = _Call()
+                else:
+                    counters['collapsed'] += 1
+
+            if not leader:
+                call.done.wait()
+                if call.error is not None:
+                    raise call.error
+                return call.result
+
+            try:
+                call.result = fn(*args, **kwargs)
+            except BaseException as error:
+                call.error = error
+                raise
+            finally:
+                with lock:
+                    del in_flight[key]
+                    if call.error is None:
+                        wrapper.cache.put(key, (call.result,))
+                call.done.set()
+            return call.result
+
+        def stats():
+            """
+            Returns the hits, misses and collapsed calls of the function,
+            and its hit ratio. Collapsed calls are misses that waited for
+            another caller's computation instead of running their own.
+            """
+            with lock:
+                lookups = counters['hits'] + counters['misses']
+                return {
+                    **counters,
+                    'items': len(wrapper.cache.cache_data),
+                    'hit_ratio': (counters['hits'] / lookups
+                                  if lookups else 0.0)
+                }
+
+        def cache_clear():
+            """
+            Empties the cache and resets the counters.
+            """
+            with lock:
+                wrapper.cache = new_cache()
+                for counter in counters:
+                    counters[counter] = 0
+
+        wrapper.cache = new_cache()
+        wrapper.stats = stats
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+A module that records the key stream of a caching system to a compact
+binary trace file.
+"""
+
+import sys
+from array import array
+
+MAGIC = b'CTRC'
+VERSION = 1
+PUT_FLAG = 1 << 31
+
+
+class TraceRecorder():
+    """
+    A wrapper recording the get and put calls made on any caching system.
+
+    Each call is stored as one 32-bit record: the high bit tells a put
+    from a get and the low bits hold a key id, given to every distinct
+    key in order of first use. Keys themselves are never written, so a
+    trace is 4 bytes per operation whatever the keys look like.
+
+    Every other attribute is read from the wrapped cache, so the recorder
+    can stand in for it.
+    """
+
+    def __init__(self, cache, path, buffer_size=65536):
+        """
+        Initializes the recorder and writes the trace header.
+
+        Args:
+            cache: The caching system to wrap.
+            path (str): The path of the trace file to create.
+            buffer_size (int): The number of records buffered in memory
+                               before they are written to the file.
+        """
+        self.cache = cache
+        self.key_ids = {}
+        self.buffer = array('I')
+        self.buffer_size = buffer_size
+        self.file = open(path, 'wb')
+        self.file.write(MAGIC + bytes([VERSION]) +
+                        (b'<' if sys.byteorder == 'little' else b'>'))
+
+    def _record(self, key, flag):
+        """
+        Buffers the record of one call.
+
+        Args:
+            key: The key of the call.
+            flag (int): PUT_FLAG for a put, 0 for a get.
+        """
+        key_id = self.key_ids.get(key)
+        if key_id is None:
+            key_id = self.key_ids[key] = len(self.key_ids)
+            if key_id >= PUT_FLAG:
+                raise OverflowError("too many distinct keys for a trace")
+        self.buffer.append(key_id | flag)
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def put(self, key, item, *args, **kwargs):
+        """
+        Records a put, then assigns the item to the wrapped cache.
+
+        Args:
+            key: The key for the item to be stored.
+            item: The value of the item to be stored.
+            *args: Extra arguments forwarded to the cache, e.g. a ttl.
+            **kwargs: Extra keyword arguments forwarded to the cache.
+        """
+        if key is not None and item is not None:
+            self._record(key, PUT_FLAG)
+        return self.cache.put(key, item, *args, **kwargs)
+
+    def get(self, key):
+        """
+        Records a get, then retrieves the item from the wrapped cache.
+
+        Args:
+            key: The key of the item to retrieve.
+
+        Returns:
+            The value returned by the wrapped cache.
+        """
+        if key is not None:
+            self._record(key, 0)
+        return self.cache.get(key)
+
+    def flush(self):
+        """
+        Writes the buffered records to the trace file.
+        """
+        self.buffer.tofile(self.file)
+        self.file.flush()
+        del self.buffer[:]
+
+    def close(self):
+        """
+        Writes the remaining records and closes the trace file.
+        """
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        """
+        Returns the recorder for use in a with statement.
+        """
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Closes the trace file at the end of a with statement.
+        """
+        self.close()
+
+    def __getattr__(self, name):
+        """
+        Reads the attributes the recorder lacks from the wrapped cache.
+
+        Args:
+            name (str): The name of the attribute.
+        """
+        if name == 'cache':
+            raise AttributeError(name)
+        return getattr(self.cache, name)
+
+
+def load_trace(path):
+    """
+    Reads a trace file written by TraceRecorder.
+
+    Args:
+        path (str): The path of the trace file.
+
+    Returns:
+        array: The records of the trace; a record with PUT_FLAG set is a
+        put of key id record & ~PUT_FLAG, any other record a get.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(len(MAGIC) + 2)
+        if header[:len(MAGIC)] != MAGIC or header[len(MAGIC)] != VERSION:
+            raise ValueError(f"{path} is not a cache trace")
+        records = array('I')
+        records.frombytes(f.read())
+    if header[-1:] != (b'<' if sys.byteorder == 'little' else b'>'):
+        records.byteswap()
+    return records
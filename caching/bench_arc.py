@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Trace-replay benchmark of the caching policies on a scan-heavy workload.
+
+The trace mixes lookups of a small hot set with long sequential scans
+over keys that are never used again, as a batch job would. Every policy
+replays the same trace as get-then-put-on-miss.
+
+Usage: ./bench_arc.py [operations] [capacity] [hot_keys] [scan_length]
+"""
+import random
+import sys
+import time
+
+print_discard = __import__('policy_caching').print_discard
+POLICIES = (
+    __import__('1-fifo_cache').FIFOCache,
+    __import__('2-lifo_cache').LIFOCache,
+    __import__('3-lru_cache').LRUCache,
+    __import__('4-mru_cache').MRUCache,
+    __import__('5-lfu_cache').LFUCache,
+    __import__('7-arc_cache').ARCCache,
+)
+
+
+def mixed_trace(operations, hot_keys, scan_length, seed=0):
+    """
+    Builds a trace of hot-set lookups interrupted by sequential scans.
+
+    Args:
+        operations (int): The number of keys in the trace.
+        hot_keys (int): The size of the hot set.
+        scan_length (int): The number of keys of one scan.
+        seed (int): The seed of the random generator.
+
+    Returns:
+        list: The keys of the trace.
+    """
+    rng = random.Random(seed)
+    trace = []
+    scanned = 0
+    while len(trace) < operations:
+        for _ in range(scan_length * 2):
+            trace.append(f"hot-{rng.randrange(hot_keys)}")
+        for _ in range(scan_length):
+            trace.append(f"scan-{scanned}")
+            scanned += 1
+    return trace[:operations]
+
+
+def replay(cache_class, trace, capacity):
+    """
+    Replays a trace as get-then-put-on-miss against a cache.
+
+    Args:
+        cache_class: The caching class to instantiate.
+        trace (list): The keys to replay.
+        capacity (int): The number of items the cache holds.
+
+    Returns:
+        tuple: The hit ratio and the number of operations per second.
+    """
+    cache = cache_class(capacity=capacity)
+    cache.remove_listener(print_discard)
+    hits = 0
+    start = time.perf_counter()
+    for key in trace:
+        if cache.get(key) is not None:
+            hits += 1
+        else:
+            cache.put(key, key)
+    elapsed = time.perf_counter() - start
+    return hits / len(trace), len(trace) / elapsed
+
+
+def main():
+    """
+    Runs the benchmark and prints one line per caching policy.
+    """
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    capacity = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    hot_keys = int(sys.argv[3]) if len(sys.argv) > 3 else 800
+    scan_length = int(sys.argv[4]) if len(sys.argv) > 4 else 2000
+
+    trace = mixed_trace(operations, hot_keys, scan_length)
+    print(f"{operations} ops, capacity {capacity}, {hot_keys} hot keys, "
+          f"scans of {scan_length} keys")
+    for cache_class in POLICIES:
+        hit_ratio, ops_per_sec = replay(cache_class, trace, capacity)
+        print(f"{cache_class.__name__:>10}: hit ratio {hit_ratio:.3f}, "
+              f"{ops_per_sec:,.0f} ops/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark comparing LFUCache and LRUCache on a Zipfian key stream.
+
+Usage: ./bench_lfu.py [operations] [distinct_keys] [capacity] [skew]
+"""
+import itertools
+import random
+import sys
+import time
+
+print_discard = __import__('policy_caching').print_discard
+LRUCache = __import__('3-lru_cache').LRUCache
+LFUCache = __import__('5-lfu_cache').LFUCache
+
+
+def zipf_stream(operations, distinct_keys, skew, seed=0):
+    """
+    Builds a list of keys drawn from a Zipf distribution.
+
+    Args:
+        operations (int): The number of keys to draw.
+        distinct_keys (int): The size of the key space.
+        skew (float): The Zipf exponent; larger values mean hotter keys.
+        seed (int): The seed of the random generator.
+
+    Returns:
+        list: The drawn keys, as strings.
+    """
+    rng = random.Random(seed)
+    weights = [1 / (rank ** skew) for rank in range(1, distinct_keys + 1)]
+    cumulative = list(itertools.accumulate(weights))
+    keys = [f"key-{rank}" for rank in range(distinct_keys)]
+    return rng.choices(keys, cum_weights=cumulative, k=operations)
+
+
+def run(cache_class, stream, capacity):
+    """
+    Replays a key stream as get-then-put-on-miss against a cache.
+
+    Args:
+        cache_class: The caching class to instantiate.
+        stream (list): The keys to replay.
+        capacity (int): The number of items the cache holds.
+
+    Returns:
+        tuple: The hit ratio and the number of operations per second.
+    """
+    cache = cache_class(capacity=capacity)
+    cache.remove_listener(print_discard)
+    hits = 0
+    start = time.perf_counter()
+    for key in stream:
+        if cache.get(key) is not None:
+            hits += 1
+        else:
+            cache.put(key, key)
+    elapsed = time.perf_counter() - start
+    return hits / len(stream), len(stream) / elapsed
+
+
+def main():
+    """
+    Runs the benchmark and prints one line per caching policy.
+    """
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    distinct_keys = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    capacity = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+    skew = float(sys.argv[4]) if len(sys.argv) > 4 else 1.0
+
+    stream = zipf_stream(operations, distinct_keys, skew)
+    print(f"{operations} ops, {distinct_keys} keys, "
+          f"capacity {capacity}, zipf skew {skew}")
+    for cache_class in (LRUCache, LFUCache):
+        hit_ratio, ops_per_sec = run(cache_class, stream, capacity)
+        print(f"{cache_class.__name__:>10}: hit ratio {hit_ratio:.3f}, "
+              f"{ops_per_sec:,.0f} ops/sec")
+
+
+if __name__ == "__main__":
+    main()
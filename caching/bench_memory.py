@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark of the LRU/MRU caches and CompactLRUCache.
+
+Keys and items are created before measuring, so the reported bytes per
+entry only count the bookkeeping of each cache.
+
+Usage: ./bench_memory.py [entries]
+"""
+import sys
+import time
+import tracemalloc
+
+POLICIES = (
+    __import__('3-lru_cache').LRUCache,
+    __import__('4-mru_cache').MRUCache,
+    __import__('10-compact_lru_cache').CompactLRUCache,
+)
+
+
+def measure(cache_class, keys):
+    """
+    Fills a cache with one entry per key and measures its memory.
+
+    Args:
+        cache_class: The caching class to instantiate.
+        keys (list): The keys to put; each key is also its item.
+
+    Returns:
+        tuple: The bytes per entry and the puts per second.
+    """
+    tracemalloc.start()
+    cache = cache_class(capacity=len(keys))
+    start = time.perf_counter()
+    for key in keys:
+        cache.put(key, key)
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del cache
+    return size / len(keys), len(keys) / elapsed
+
+
+def main():
+    """
+    Runs the benchmark and prints one line per caching class.
+    """
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    keys = [f"key-{i}" for i in range(entries)]
+    print(f"{entries} entries")
+    for cache_class in POLICIES:
+        per_entry, puts_per_sec = measure(cache_class, keys)
+        print(f"{cache_class.__name__:>16}: {per_entry:6.1f} bytes/entry, "
+              f"{puts_per_sec:,.0f} puts/sec (traced)")
+
+
+if __name__ == "__main__":
+    main()
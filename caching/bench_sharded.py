@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark of ShardedCache throughput from 1 to 16 threads.
+
+A single shard behaves like one cache behind a global lock; it is
+compared against a cache striped over several shards.
+
+Usage: ./bench_sharded.py [operations] [shards] [policy_module]
+"""
+import random
+import sys
+import threading
+import time
+
+ShardedCache = __import__('6-sharded_cache').ShardedCache
+print_discard = __import__('policy_caching').print_discard
+
+POLICIES = {
+    '1-fifo_cache': 'FIFOCache',
+    '2-lifo_cache': 'LIFOCache',
+    '3-lru_cache': 'LRUCache',
+    '4-mru_cache': 'MRUCache',
+    '5-lfu_cache': 'LFUCache',
+}
+
+
+def worker(cache, keys, barrier):
+    """
+    Replays a list of keys as get-then-put-on-miss.
+
+    Args:
+        cache (ShardedCache): The shared cache.
+        keys (list): The keys this thread replays.
+        barrier (threading.Barrier): Starts all the threads together.
+    """
+    barrier.wait()
+    for key in keys:
+        if cache.get(key) is None:
+            cache.put(key, key)
+
+
+def run(policy, shards, threads, operations, capacity):
+    """
+    Measures the throughput of one cache shared by several threads.
+
+    Args:
+        policy: The caching class used for the shards.
+        shards (int): The number of shards.
+        threads (int): The number of worker threads.
+        operations (int): The total number of keys replayed.
+        capacity (int): The total number of items, split between shards.
+
+    Returns:
+        tuple: The operations per second and the cache statistics.
+    """
+    cache = ShardedCache(policy, shards=shards, capacity=capacity // shards)
+    cache.remove_listener(print_discard)
+    rng = random.Random(threads)
+    per_thread = operations // threads
+    streams = [[f"key-{rng.randrange(4096)}" for _ in range(per_thread)]
+               for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+    pool = [threading.Thread(target=worker, args=(cache, keys, barrier))
+            for keys in streams]
+    for thread in pool:
+        thread.start()
+    start = time.perf_counter()
+    barrier.wait()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return per_thread * threads / elapsed, cache.stats()
+
+
+def main():
+    """
+    Runs the benchmark and prints one line per thread count.
+    """
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 400000
+    shards = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    module = sys.argv[3] if len(sys.argv) > 3 else '3-lru_cache'
+    policy = getattr(__import__(module), POLICIES[module])
+
+    capacity = 2048
+    print(f"{policy.__name__}, {operations} ops, {capacity} items in total")
+    for threads in (1, 2, 4, 8, 16):
+        single, _ = run(policy, 1, threads, operations, capacity)
+        striped, stats = run(policy, shards, threads, operations, capacity)
+        hit_ratio = stats['hit_ratio']
+        print(f"{threads:>2} threads: 1 shard {single:>12,.0f} ops/sec | "
+              f"{shards} shards {striped:>12,.0f} ops/sec "
+              f"(hit ratio {hit_ratio:.3f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+A module that defines the bookkeeping shared by the caching policies.
+"""
+import threading
+import time
+
+BaseCaching = __import__('base_caching').BaseCaching
+TimerWheel = __import__('timer_wheel').TimerWheel
+
+
+def print_discard(key, item):
+    """
+    Prints the key of an evicted item; the default eviction listener.
+
+    Args:
+        key: The key of the evicted item.
+        item: The evicted item.
+    """
+    print(f"DISCARD: {key}")
+
+
+class PolicyCaching(BaseCaching):
+    """
+    A caching system bounded by a per-instance capacity.
+
+    Without a weigher every item weighs 1, so the capacity is a number of
+    items (BaseCaching.MAX_ITEMS by default). With a weigher, such as
+    sys.getsizeof or len, the capacity bounds the total weight of the
+    items instead.
+
+    Items may also expire after a time to live, given per item or as a
+    default for the cache. Expired items are dropped lazily when get finds
+    them, or in the background by a reaper driven by a timer wheel.
+
+    Every eviction is passed to the eviction listeners, print_discard
+    by default, and the cache counts its hits, misses, evictions and
+    expirations so that it can be monitored through stats without any
+    I/O per operation.
+
+    Subclasses implement put and get, and choose which key to evict in
+    _victim.
+    """
+
+    def __init__(self, capacity=None, weigher=None, ttl=None):
+        """
+        Initializes the cache.
+
+        Args:
+            capacity: The maximum total weight of the cache. Defaults to
+                      BaseCaching.MAX_ITEMS.
+            weigher: An optional callable returning the weight of an item.
+            ttl: The default number of seconds before an item expires.
+                 Defaults to never.
+        """
+        super().__init__()
+        if capacity is None:
+            capacity = BaseCaching.MAX_ITEMS
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.weigher = weigher
+        self.weights = {}
+        self.total_weight = 0
+        self.ttl = ttl
+        self.deadlines = {}
+        self.wheel = None
+        self.lock = threading.RLock()
+        self._reaper_stop = None
+        self.listeners = [print_discard]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _weigh(self, item):
+        """
+        Returns the weight of an item.
+
+        Args:
+            item: The item to weigh.
+        """
+        if self.weigher is None:
+            return 1
+        return self.weigher(item)
+
+    def _weight_of(self, key):
+        """
+        Returns the weight currently held by a key, 0 if it is absent.
+
+        Args:
+            key: The key to look up.
+        """
+        if key not in self.cache_data:
+            return 0
+        if self.weigher is None:
+            return 1
+        return self.weights[key]
+
+    def _needs_room(self, key, weight):
+        """
+        Tells whether storing an item would exceed the capacity.
+
+        Args:
+            key: The key of the item to be stored.
+            weight: The weight of the item to be stored.
+        """
+        return (self.total_weight - self._weight_of(key) + weight >
+                self.capacity)
+
+    def _make_room(self, key, weight):
+        """
+        Discards items until an item of the given weight fits.
+
+        The key itself is never discarded. Items heavier than the whole
+        capacity are not cached at all; a previous value stored under the
+        same key is dropped so that get never returns a stale value.
+
+        Args:
+            key: The key of the item to be stored.
+            weight: The weight of the item to be stored.
+
+        Returns:
+            bool: True if the item fits, False if it cannot be cached.
+        """
+        if weight > self.capacity:
+            if key in self.cache_data:
+                self._remove(key)
+            return False
+        while self._needs_room(key, weight):
+            self._discard(self._victim(key))
+        return True
+
+    def _store(self, key, item, weight, ttl=None):
+        """
+        Assigns an item to the cache dictionary and records its weight
+        and its deadline.
+
+        Args:
+            key: The key for the item to be stored.
+            item: The value of the item to be stored.
+            weight: The weight of the item to be stored.
+            ttl: The number of seconds before the item expires. Defaults
+                 to the ttl of the cache.
+        """
+        self.total_weight += weight - self._weight_of(key)
+        if self.weigher is not None:
+            self.weights[key] = weight
+        self.cache_data[key] = item
+        if ttl is None:
+            ttl = self.ttl
+        if ttl is None:
+            self.deadlines.pop(key, None)
+        else:
+            deadline = time.monotonic() + ttl
+            self.deadlines[key] = deadline
+            if self.wheel is not None:
+                self.wheel.schedule(key, deadline)
+
+    def _remove(self, key):
+        """
+        Removes an item from the cache dictionary and forgets its weight.
+
+        Args:
+            key: The key of the item to remove.
+
+        Returns:
+            The removed item.
+        """
+        self.total_weight -= self._weight_of(key)
+        self.weights.pop(key, None)
+        self.deadlines.pop(key, None)
+        return self.cache_data.pop(key)
+
+    def _expired(self, key):
+        """
+        Drops an item if its deadline has passed.
+
+        Args:
+            key: The key of the item to check.
+
+        Returns:
+            bool: True if the item has expired and was dropped.
+        """
+        deadline = self.deadlines.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            return True
+        return False
+
+    def _tally(self, item):
+        """
+        Counts the result of a lookup as a hit or a miss.
+
+        Args:
+            item: The item found, or None.
+
+        Returns:
+            The item, unchanged.
+        """
+        if item is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return item
+
+    def _discard(self, key):
+        """
+        Evicts an item chosen by the replacement policy and passes it to
+        the eviction listeners.
+
+        Args:
+            key: The key of the item to evict.
+        """
+        item = self._remove(key)
+        self.evictions += 1
+        for listener in self.listeners:
+            listener(key, item)
+
+    def _victim(self, key):
+        """
+        Chooses the key to evict next.
+
+        Args:
+            key: The key being stored, which must not be chosen.
+        """
+        raise NotImplementedError("_victim must be implemented in your "
+                                  "cache class")
+
+    def add_listener(self, listener):
+        """
+        Registers a callable called with the key and item of every
+        eviction.
+
+        To hand evictions to another thread, pass a function feeding a
+        queue, e.g. lambda key, item: events.put_nowait((key, item)).
+
+        Args:
+            listener: The callable to register.
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """
+        Unregisters an eviction listener. Removing print_discard silences
+        the DISCARD lines.
+
+        Args:
+            listener: The callable to unregister.
+        """
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def stats(self):
+        """
+        Returns the counters of the cache.
+
+        Returns:
+            dict: The number of items, the total weight and capacity, the
+            hit, miss, eviction and expiration counts, and the hit ratio
+            of get calls.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'items': len(self.cache_data),
+            'weight': self.total_weight,
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_ratio': self.hits / lookups if lookups else 0.0
+        }
+
+    def _start_wheel(self, resolution):
+        """
+        Creates the timer wheel and schedules the current deadlines on it.
+
+        Args:
+            resolution (float): The duration of one tick, in seconds.
+        """
+        self.wheel = TimerWheel(resolution=resolution)
+        for key, deadline in self.deadlines.items():
+            self.wheel.schedule(key, deadline)
+
+    def reap(self):
+        """
+        Drops the items whose deadline has passed.
+
+        The first call schedules the current deadlines on a timer wheel;
+        from then on every call only visits the wheel slots that elapsed
+        since the previous one, so expiry costs amortized O(1) per item
+        instead of a scan of the cache dictionary.
+
+        Returns:
+            int: The number of items dropped.
+        """
+        if self.wheel is None:
+            self._start_wheel(1.0)
+        now = time.monotonic()
+        dropped = 0
+        for key in self.wheel.advance(now):
+            deadline = self.deadlines.get(key)
+            if deadline is not None and deadline <= now:
+                self._remove(key)
+                dropped += 1
+        self.expirations += dropped
+        return dropped
+
+    def start_reaper(self, interval=1.0):
+        """
+        Starts a daemon thread that calls reap every interval seconds.
+
+        The thread holds the lock of the cache while it reaps, so code
+        that shares the cache with the reaper must hold cache.lock around
+        put and get as well, as ShardedCache does.
+
+        Args:
+            interval (float): The number of seconds between two reaps,
+                              also used as the resolution of the wheel.
+        """
+        with self.lock:
+            if self._reaper_stop is not None:
+                return
+            if self.wheel is None:
+                self._start_wheel(interval)
+            self._reaper_stop = threading.Event()
+        threading.Thread(target=self._reap_forever,
+                         args=(self._reaper_stop, interval),
+                         daemon=True).start()
+
+    def stop_reaper(self):
+        """
+        Stops the thread started by start_reaper, if any.
+        """
+        with self.lock:
+            if self._reaper_stop is not None:
+                self._reaper_stop.set()
+                self._reaper_stop = None
+
+    def _reap_forever(self, stop, interval):
+        """
+        Calls reap every interval seconds until stop is set.
+
+        Args:
+            stop (threading.Event): Set to end the thread.
+            interval (float): The number of seconds between two reaps.
+        """
+        while not stop.wait(interval):
+            with self.lock:
+                self.reap()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+A module that defines a hashed timer wheel for expiring cache items.
+"""
+import time
+
+
+class TimerWheel():
+    """
+    A hashed timer wheel.
+
+    Deadlines are hashed into a fixed ring of slots by the tick they fall
+    in, so scheduling is O(1) and advancing the clock only visits the slots
+    that elapsed since the previous advance, instead of every scheduled
+    key. A slot may also hold deadlines of later rotations; those stay in
+    place until their turn comes.
+    """
+
+    def __init__(self, resolution=1.0, slots=64, now=None):
+        """
+        Initializes the wheel.
+
+        Args:
+            resolution (float): The duration of one tick, in seconds.
+            slots (int): The number of slots of the ring.
+            now (float): The time.monotonic() value the wheel starts at.
+        """
+        if resolution <= 0 or slots < 1:
+            raise ValueError("resolution and slots must be positive")
+        if now is None:
+            now = time.monotonic()
+        self.resolution = resolution
+        self.slots = [{} for _ in range(slots)]
+        # The last tick whose slot has been fully processed.
+        self.tick = int(now / resolution) - 1
+
+    def schedule(self, key, deadline):
+        """
+        Schedules a key to come due at a deadline.
+
+        Scheduling the same key again does not cancel the earlier entry;
+        callers check the current deadline of the keys that come due.
+
+        Args:
+            key: The key to schedule.
+            deadline (float): The time.monotonic() value the key is due at.
+        """
+        tick = max(int(deadline / self.resolution), self.tick + 1)
+        self.slots[tick % len(self.slots)][key] = deadline
+
+    def advance(self, now):
+        """
+        Advances the wheel up to a time and collects the keys that came due.
+
+        Only the ticks that have fully elapsed are processed, so a key may
+        come due up to one resolution after its deadline.
+
+        Args:
+            now (float): The current time.monotonic() value.
+
+        Returns:
+            list: The keys whose scheduled deadline is at or before now.
+        """
+        current = int(now / self.resolution) - 1
+        due = []
+        elapsed = min(current - self.tick, len(self.slots))
+        for step in range(1, elapsed + 1):
+            slot = self.slots[(self.tick + step) % len(self.slots)]
+            keys = [key for key, deadline in slot.items() if deadline <= now]
+            for key in keys:
+                del slot[key]
+            due.extend(keys)
+        self.tick = max(self.tick, current)
+        return due
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Replays a recorded cache trace against every caching policy at several
+capacities, and prints the hit-ratio curve and throughput of each.
+
+Usage: ./trace_simulator.py TRACE [-c CAPACITY ...]
+       ./trace_simulator.py --demo TRACE
+"""
+import argparse
+import random
+import time
+
+print_discard = __import__('policy_caching').print_discard
+trace_recorder = __import__('9-trace_recorder')
+POLICIES = (
+    __import__('1-fifo_cache').FIFOCache,
+    __import__('2-lifo_cache').LIFOCache,
+    __import__('3-lru_cache').LRUCache,
+    __import__('4-mru_cache').MRUCache,
+    __import__('5-lfu_cache').LFUCache,
+    __import__('7-arc_cache').ARCCache,
+)
+
+
+def simulate(cache_class, records, capacity):
+    """
+    Replays the records of a trace against a new cache.
+
+    The trace is treated as a stream of requests: a get that misses fills
+    the cache with its key, as the caller of a cache would, and a recorded
+    put that only fills the key of the miss just before it is skipped.
+    Other puts are replayed as writes. The hit ratio is the share of gets
+    that found their key.
+
+    Args:
+        cache_class: The caching class to instantiate.
+        records (array): The records of the trace.
+        capacity (int): The number of items the cache holds.
+
+    Returns:
+        tuple: The hit ratio and the number of operations per second.
+    """
+    cache = cache_class(capacity=capacity)
+    cache.remove_listener(print_discard)
+    put_flag = trace_recorder.PUT_FLAG
+    key_mask = put_flag - 1
+    gets = hits = 0
+    missed = None
+    start = time.perf_counter()
+    for record in records:
+        if record & put_flag:
+            key = record & key_mask
+            if key != missed:
+                cache.put(key, True)
+            missed = None
+        else:
+            gets += 1
+            if cache.get(record) is not None:
+                hits += 1
+                missed = None
+            else:
+                cache.put(record, True)
+                missed = record
+    elapsed = time.perf_counter() - start
+    return (hits / gets if gets else 0.0,
+            len(records) / elapsed if elapsed else 0.0)
+
+
+def record_demo(path, operations=200000, keys=5000):
+    """
+    Records a demo trace of get-then-put-on-miss calls on skewed keys.
+
+    Args:
+        path (str): The path of the trace file to create.
+        operations (int): The number of gets to record.
+        keys (int): The size of the key space.
+    """
+    rng = random.Random(0)
+    cache = POLICIES[2](capacity=keys)
+    with trace_recorder.TraceRecorder(cache, path) as recorder:
+        for _ in range(operations):
+            key = f"key-{int(keys * rng.random() ** 3)}"
+            if recorder.get(key) is None:
+                recorder.put(key, key)
+
+
+def main():
+    """
+    Parses the command line, replays the trace and prints the tables.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('trace', help="trace file written by TraceRecorder")
+    parser.add_argument('-c', '--capacity', type=int, action='append',
+                        help="capacity to simulate, may be repeated")
+    parser.add_argument('--demo', action='store_true',
+                        help="record a demo trace to TRACE first")
+    args = parser.parse_args()
+
+    if args.demo:
+        record_demo(args.trace)
+    records = trace_recorder.load_trace(args.trace)
+    distinct = len({record & (trace_recorder.PUT_FLAG - 1)
+                    for record in records})
+    capacities = sorted(args.capacity or
+                        [max(1, distinct * share // 100)
+                         for share in (1, 5, 10, 25, 50)])
+
+    results = {}
+    for cache_class in POLICIES:
+        for capacity in capacities:
+            results[cache_class, capacity] = simulate(cache_class, records,
+                                                      capacity)
+
+    print(f"{args.trace}: {len(records)} operations, {distinct} keys")
+    header = ''.join(f"{capacity:>10}" for capacity in capacities)
+    print(f"\nHit ratio by capacity\n{'':>10}{header}")
+    for cache_class in POLICIES:
+        row = ''.join(f"{results[cache_class, capacity][0]:>10.3f}"
+                      for capacity in capacities)
+        print(f"{cache_class.__name__:>10}{row}")
+    print(f"\nOperations per second by capacity\n{'':>10}{header}")
+    for cache_class in POLICIES:
+        row = ''.join(f"{results[cache_class, capacity][1]:>10,.0f}"
+                      for capacity in capacities)
+        print(f"{cache_class.__name__:>10}{row}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ Deletion-resilient hypermedia pagination
 
 import csv
 import math
+from bisect import bisect_left
 from typing import List, Dict
 
 
@@ -16,6 +17,7 @@ class Server:
     def __init__(self):
         self.__dataset = None
         self.__indexed_dataset = None
+        self.__live_indexes = None
 
     def dataset(self) -> List[List]:
         """Cached dataset
@@ -41,6 +43,32 @@ class Server:
             }
         return self.__indexed_dataset
 
+    def live_indexes(self) -> List[int]:
+        """Sorted indexes of the rows not deleted
+
+        It is kept in sync by delete(), and rebuilt when indexed_dataset
+        was changed directly.
+        """
+        indexed_data = self.indexed_dataset()
+        if self.__live_indexes is None or \
+           len(self.__live_indexes) != len(indexed_data):
+            self.__live_indexes = sorted(indexed_data)
+        return self.__live_indexes
+
+    def delete(self, index: int) -> None:
+        """
+        Deletes a row, keeping the index of the others.
+
+        Args:
+            index (int): The index of the row.
+
+        Raises:
+            KeyError: If the row does not exist or is already deleted.
+        """
+        live_indexes = self.live_indexes()
+        del self.indexed_dataset()[index]
+        del live_indexes[bisect_left(live_indexes, index)]
+
     def get_hyper_index(self, index: int = None, page_size: int = 10) -> Dict:
         """
         Gets a page of data using an index, resilient to deletions.
@@ -53,7 +81,8 @@ class Server:
             Dict: A dictionary containing pagination details.
         """
         indexed_data = self.indexed_dataset()
-        max_index = len(indexed_data)
+        live_indexes = self.live_indexes()
+        max_index = live_indexes[-1] + 1 if live_indexes else 0
 
         # Use 0 for the start index if None is provided
         start_index = index if index is not None else 0
@@ -61,18 +90,13 @@ class Server:
         # Assert that the start_index is within a valid range
         assert isinstance(start_index, int) and 0 <= start_index < max_index
 
-        data = []
-        count = 0
-        current_index = start_index
-
-        while count < page_size and current_index < max_index:
-            # Check if the current index exists in the dataset (it might be deleted)
-            if current_index in indexed_data:
-                data.append(indexed_data[current_index])
-                count += 1
-            current_index += 1
+        # The first row not deleted from start_index, then the next ones:
+        # O(log n + page_size) whatever the number of deleted rows
+        position = bisect_left(live_indexes, start_index)
+        page_indexes = live_indexes[position:position + page_size]
+        data = [indexed_data[i] for i in page_indexes]
 
-        next_index = current_index
+        next_index = page_indexes[-1] + 1 if page_indexes else start_index
 
         return {
             'index': start_index,
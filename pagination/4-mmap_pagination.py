@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+A module for pagination over a memory-mapped CSV file with a persisted
+row-offset index.
+"""
+import csv
+import io
+import mmap
+import os
+import sys
+from array import array
+from itertools import accumulate, islice
+from typing import List, Optional, Sequence, Tuple
+
+# An index file is INDEX_MAGIC, the byte order padded to 8 bytes, the
+# size and mtime_ns of the CSV file, then the offsets, all 'Q' aligned.
+INDEX_MAGIC = b'CSVIDX1\n'
+INDEX_HEADER_SIZE = len(INDEX_MAGIC) + 8 + 16
+CHUNK_SIZE = 1 << 24
+
+
+def index_range(page: int, page_size: int) -> Tuple[int, int]:
+    """
+    Calculates the start and end index for a given page and page size.
+
+    Args:
+        page (int): The current page number (1-indexed).
+        page_size (int): The number of items per page.
+
+    Returns:
+        Tuple[int, int]: A tuple containing the start and end index.
+    """
+    start_index = (page - 1) * page_size
+    end_index = start_index + page_size
+    return (start_index, end_index)
+
+
+def build_row_index(data: bytes) -> array:
+    """
+    Finds the byte offset of every row of a CSV file.
+
+    The file is scanned in chunks ending on a newline. Chunks without
+    quotes are split on newlines in C; in the others, a newline only ends
+    a row outside a quoted field, as csv.reader reads it.
+
+    Args:
+        data (bytes): The content of the file, e.g. a mmap.
+
+    Returns:
+        array: The offsets ('Q') of the start of each row, header
+        included, followed by the size of the file.
+    """
+    offsets = array('Q', [0])
+    size = len(data)
+    position = 0
+    quoted = False
+    while position < size:
+        limit = min(position + CHUNK_SIZE, size)
+        end = data.rfind(b'\n', position, limit) + 1 if limit < size \
+            else size
+        if end <= position:
+            # No newline in the window: the chunk is one long row
+            end = data.find(b'\n', limit)
+            end = size if end < 0 else end + 1
+        chunk = data[position:end]
+        if not quoted and b'"' not in chunk:
+            lines = chunk.split(b'\n')
+            offsets.extend(islice(accumulate(
+                (len(line) + 1 for line in lines[:-1]), initial=position
+            ), 1, None))
+        else:
+            start = 0
+            newline = chunk.find(b'\n')
+            while newline >= 0:
+                quoted ^= chunk.count(b'"', start, newline) % 2 == 1
+                if not quoted:
+                    offsets.append(position + newline + 1)
+                start = newline + 1
+                newline = chunk.find(b'\n', start)
+        position = end
+    if offsets[-1] != size:
+        offsets.append(size)
+    return offsets
+
+
+def load_row_index(index_path: str, size: int,
+                   mtime_ns: int) -> Optional[Sequence[int]]:
+    """
+    Maps a row index written by save_row_index, if it matches the file.
+
+    An index in the native byte order is memory-mapped and read in place,
+    so loading it costs no copy whatever the number of rows.
+
+    Args:
+        index_path (str): The path of the index file.
+        size (int): The size of the CSV file.
+        mtime_ns (int): The modification time of the CSV file.
+
+    Returns:
+        Optional[Sequence[int]]: The offsets, or None if the index is
+        missing, unreadable or was built for another version of the file.
+    """
+    try:
+        with open(index_path, 'rb') as f:
+            header = f.read(INDEX_HEADER_SIZE)
+            if len(header) < INDEX_HEADER_SIZE or \
+               header[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+                return None
+            stamp = array('Q')
+            stamp.frombytes(header[-16:])
+            native = header[len(INDEX_MAGIC):len(INDEX_MAGIC) + 1] == \
+                _byteorder()
+            if not native:
+                stamp.byteswap()
+            if list(stamp) != [size, mtime_ns]:
+                return None
+            if native:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                offsets = memoryview(mapped)[INDEX_HEADER_SIZE:].cast('Q')
+            else:
+                offsets = array('Q')
+                offsets.frombytes(f.read())
+                offsets.byteswap()
+    except (OSError, ValueError, TypeError):
+        return None
+    return offsets if len(offsets) else None
+
+
+def save_row_index(index_path: str, offsets: array, size: int,
+                   mtime_ns: int) -> None:
+    """
+    Writes a row index next to its CSV file, atomically.
+
+    Args:
+        index_path (str): The path of the index file.
+        offsets (array): The offsets returned by build_row_index.
+        size (int): The size of the CSV file.
+        mtime_ns (int): The modification time of the CSV file.
+    """
+    temporary = f"{index_path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as f:
+        f.write(INDEX_MAGIC + _byteorder().ljust(8, b'\0'))
+        array('Q', [size, mtime_ns]).tofile(f)
+        offsets.tofile(f)
+    os.replace(temporary, index_path)
+
+
+def _byteorder() -> bytes:
+    """
+    Returns the marker of the native byte order written in index files.
+    """
+    return b'<' if sys.byteorder == 'little' else b'>'
+
+
+class Server:
+    """Server class to paginate a database of popular baby names.
+
+    The CSV file is memory-mapped instead of read, and a row-offset index
+    (8 bytes per row) is built on first use and saved next to it, then
+    memory-mapped while the file is unchanged. A page only decodes and parses
+    its own rows, so neither the startup cost nor the memory grows with
+    the number of rows beyond the index.
+    """
+    DATA_FILE = "Popular_Baby_Names.csv"
+
+    def __init__(self, index_path: Optional[str] = None) -> None:
+        """
+        Initializes the server; the file is opened on first use.
+
+        Args:
+            index_path (Optional[str]): Where the row index is saved.
+                Defaults to DATA_FILE + ".idx". If it cannot be written,
+                the index is kept in memory only.
+        """
+        self.index_path = index_path
+        self.__file = None
+        self.__data = None
+        self.__offsets = None
+
+    def row_offsets(self) -> Sequence[int]:
+        """Row-offset index: the start of the header, of each row, then
+        the end of the file
+        """
+        if self.__offsets is None:
+            index_path = self.index_path or self.DATA_FILE + ".idx"
+            self.__file = open(self.DATA_FILE, 'rb')
+            stat = os.fstat(self.__file.fileno())
+            self.__data = mmap.mmap(self.__file.fileno(), 0,
+                                    access=mmap.ACCESS_READ) \
+                if stat.st_size else b''
+            offsets = load_row_index(index_path, stat.st_size,
+                                     stat.st_mtime_ns)
+            if offsets is None:
+                offsets = build_row_index(self.__data)
+                try:
+                    save_row_index(index_path, offsets, stat.st_size,
+                                   stat.st_mtime_ns)
+                except OSError:
+                    pass
+            self.__offsets = offsets
+        return self.__offsets
+
+    def __len__(self) -> int:
+        """
+        Returns the number of rows, header excluded.
+        """
+        return max(0, len(self.row_offsets()) - 2)
+
+    def rows(self, start: int, end: int) -> List[List[str]]:
+        """
+        Parses a range of rows.
+
+        Args:
+            start (int): The index of the first row, header excluded.
+            end (int): The index after the last row.
+
+        Returns:
+            List[List[str]]: The rows, as csv.reader returns them.
+        """
+        offsets = self.row_offsets()
+        end = min(end, len(self))
+        if start >= end:
+            return []
+        text = self.__data[offsets[start + 1]:offsets[end + 1]]
+        return list(csv.reader(io.StringIO(text.decode('utf-8'),
+                                           newline='')))
+
+    def get_page(self, page: int = 1, page_size: int = 10) -> List[List]:
+        """
+        Gets a specific page of the dataset.
+
+        Args:
+            page (int): The page number to retrieve.
+            page_size (int): The number of items on the page.
+
+        Returns:
+            List[List]: The list of rows for the requested page,
+                        or an empty list if the page is out of range.
+        """
+        assert isinstance(page, int) and page > 0
+        assert isinstance(page_size, int) and page_size > 0
+
+        start_index, end_index = index_range(page, page_size)
+        return self.rows(start_index, end_index)
+
+    def close(self) -> None:
+        """
+        Unmaps and closes the CSV file; it is opened again on next use.
+        """
+        if isinstance(self.__data, mmap.mmap):
+            self.__data.close()
+        if self.__file is not None:
+            self.__file.close()
+        self.__file = self.__data = self.__offsets = None
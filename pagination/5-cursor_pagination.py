@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+A module for keyset pagination with opaque, tamper-evident cursors.
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import os
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+HyperServer = __import__('2-hypermedia_pagination').Server
+
+# Bytes of the HMAC-SHA256 kept in a cursor.
+MAC_SIZE = 16
+
+
+class Server(HyperServer):
+    """Server class to paginate a database of popular baby names, with
+    cursors over a sort key.
+
+    The rows are ordered once by (sort_key(row), row index), so every
+    position has a unique key. A cursor holds the key of the edge of the
+    page it comes from and the position after it, signed with HMAC: a
+    page costs O(page_size) while the dataset is unchanged, and a
+    bisection (O(log n)) otherwise, whatever its depth. get_page and
+    get_hyper are still available.
+    """
+    def __init__(self, sort_key: Optional[Callable[[List], Tuple]] = None,
+                 secret: Optional[bytes] = None) -> None:
+        """
+        Initializes the server.
+
+        Args:
+            sort_key (Optional[Callable[[List], Tuple]]): Returns the sort
+                key of a row, as a tuple of str, int or float. Defaults to
+                the order of the file.
+            secret (Optional[bytes]): The key signing the cursors. Defaults
+                to a random one, so cursors do not outlive the server.
+        """
+        super().__init__()
+        self.sort_key = sort_key
+        self.__secret = secret if secret is not None else os.urandom(32)
+        self.__keys = None
+        self.__order = None
+
+    def sorted_keys(self) -> Tuple[List[Tuple], List[int]]:
+        """Cached keys in sort order, and the row index of each
+        """
+        if self.__keys is None:
+            dataset = self.dataset()
+            if self.sort_key is None:
+                keys = [(i,) for i in range(len(dataset))]
+            else:
+                keys = sorted(tuple(self.sort_key(row)) + (i,)
+                              for i, row in enumerate(dataset))
+            self.__keys = keys
+            self.__order = [key[-1] for key in keys]
+        return self.__keys, self.__order
+
+    def encode_cursor(self, direction: str, key: Tuple,
+                      position: int) -> str:
+        """
+        Signs and encodes a cursor.
+
+        Args:
+            direction (str): "next" to page after key, "prev" before it.
+            key (Tuple): The key of the edge of the page.
+            position (int): The position after that edge.
+
+        Returns:
+            str: The cursor, URL-safe base64 without padding.
+        """
+        body = json.dumps([direction, list(key), position],
+                          separators=(',', ':')).encode('utf-8')
+        mac = hmac.new(self.__secret, body, hashlib.sha256).digest()
+        token = base64.urlsafe_b64encode(body + mac[:MAC_SIZE])
+        return token.rstrip(b'=').decode('ascii')
+
+    def decode_cursor(self, cursor: str) -> Tuple[str, Tuple, int]:
+        """
+        Checks and decodes a cursor.
+
+        Args:
+            cursor (str): A cursor returned by get_hyper_cursor.
+
+        Returns:
+            Tuple[str, Tuple, int]: Its direction, key and position.
+
+        Raises:
+            ValueError: If the cursor is malformed, or was not signed by
+                this server's secret.
+        """
+        try:
+            token = base64.urlsafe_b64decode(
+                cursor + '=' * (-len(cursor) % 4))
+        except (binascii.Error, TypeError, ValueError):
+            raise ValueError("invalid cursor") from None
+        body, mac = token[:-MAC_SIZE], token[-MAC_SIZE:]
+        expected = hmac.new(self.__secret, body, hashlib.sha256).digest()
+        if len(token) <= MAC_SIZE or \
+           not hmac.compare_digest(mac, expected[:MAC_SIZE]):
+            raise ValueError("invalid cursor")
+        direction, key, position = json.loads(body)
+        if direction not in ("next", "prev"):
+            raise ValueError("invalid cursor")
+        return direction, tuple(key), position
+
+    def _locate(self, direction: str, key: Tuple, position: int) -> int:
+        """
+        Finds the position of the first row after a "next" key, or of the
+        first row not before a "prev" key.
+
+        The position of the cursor is checked against its neighbours in
+        O(1), and only searched for when the dataset changed.
+        """
+        keys = self.sorted_keys()[0]
+        if direction == "next":
+            if 0 <= position <= len(keys) and \
+               (position == 0 or keys[position - 1] <= key) and \
+               (position == len(keys) or keys[position] > key):
+                return position
+            return bisect_right(keys, key)
+        if 0 <= position <= len(keys) and \
+           (position == 0 or keys[position - 1] < key) and \
+           (position == len(keys) or keys[position] >= key):
+            return position
+        return bisect_left(keys, key)
+
+    def get_hyper_cursor(self, cursor: Optional[str] = None,
+                         page_size: int = 10) -> Dict[str, Any]:
+        """
+        Gets a page after or before a cursor.
+
+        Args:
+            cursor (Optional[str]): The 'next' or 'prev' cursor of a
+                previous page. Defaults to the first page.
+            page_size (int): The number of items on the page.
+
+        Returns:
+            Dict[str, Any]: The page_size and data of the page, and the
+            'next' and 'prev' cursors, None at the ends of the dataset.
+
+        Raises:
+            ValueError: If the cursor is invalid.
+        """
+        assert isinstance(page_size, int) and page_size > 0
+
+        keys, order = self.sorted_keys()
+        if cursor is None:
+            start = 0
+            end = min(page_size, len(keys))
+        else:
+            direction, key, position = self.decode_cursor(cursor)
+            try:
+                position = self._locate(direction, key, position)
+            except TypeError:
+                raise ValueError("invalid cursor") from None
+            if direction == "next":
+                start, end = position, min(position + page_size, len(keys))
+            else:
+                start, end = max(0, position - page_size), position
+
+        dataset = self.dataset()
+        data = [dataset[i] for i in order[start:end]]
+        return {
+            'page_size': len(data),
+            'data': data,
+            'next': self.encode_cursor("next", keys[end - 1], end)
+            if 0 < end < len(keys) else None,
+            'prev': self.encode_cursor("prev", keys[start], start)
+            if start > 0 and start < len(keys) else None
+        }
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+A module for pagination over a columnar, typed copy of the dataset.
+"""
+import csv
+from array import array
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+Value = Union[int, str]
+
+
+def index_range(page: int, page_size: int) -> Tuple[int, int]:
+    """
+    Calculates the start and end index for a given page and page size.
+
+    Args:
+        page (int): The current page number (1-indexed).
+        page_size (int): The number of items per page.
+
+    Returns:
+        Tuple[int, int]: A tuple containing the start and end index.
+    """
+    start_index = (page - 1) * page_size
+    end_index = start_index + page_size
+    return (start_index, end_index)
+
+
+def narrow(values: array) -> array:
+    """
+    Copies integers into the smallest array type holding them all.
+
+    Args:
+        values (array): The integers.
+
+    Returns:
+        array: The narrowest array of the same integers.
+    """
+    low, high = (min(values), max(values)) if values else (0, 0)
+    for typecode in ('B', 'H', 'I', 'Q') if low >= 0 else \
+            ('b', 'h', 'i', 'q'):
+        bits = 8 * array(typecode).itemsize
+        if low >= 0 and high >> bits == 0 or \
+           -(1 << (bits - 1)) <= low and high < 1 << (bits - 1):
+            return array(typecode, values)
+    return values
+
+
+class Column:
+    """A column of the dataset, stored as an array of integers.
+
+    An integer column holds its values; a string column holds dictionary
+    codes, each the position of its value in `dictionary`, so a value
+    repeated on every row, like a gender, costs one or two bytes per row.
+    With NumPy, the array is a NumPy view of the same memory.
+    """
+    def __init__(self, name: str, data: array,
+                 dictionary: Optional[List[str]] = None,
+                 codes: Optional[Dict[str, int]] = None) -> None:
+        """
+        Initializes the column.
+
+        Args:
+            name (str): The name of the column, from the header.
+            data (array): The values, or the codes of the values.
+            dictionary (Optional[List[str]]): The distinct values of a
+                string column, by code; None for an integer column.
+            codes (Optional[Dict[str, int]]): The code of each value of
+                `dictionary`. Built from it when None.
+        """
+        self.name = name
+        self.dictionary = dictionary
+        self.codes: Optional[Dict[str, int]] = None
+        if dictionary is not None:
+            self.codes = codes if codes is not None else {
+                value: code for code, value in enumerate(dictionary)}
+        self.data: Sequence[int] = numpy.frombuffer(
+            data, dtype=data.typecode) if numpy is not None else data
+
+    def __len__(self) -> int:
+        """
+        Returns the number of rows.
+        """
+        return len(self.data)
+
+    def decode(self, codes: List[int]) -> List[Value]:
+        """
+        Returns the values of integers read from the column.
+
+        Args:
+            codes (List[int]): Values or dictionary codes of the column.
+        """
+        if self.dictionary is None:
+            return codes
+        dictionary = self.dictionary
+        return [dictionary[code] for code in codes]
+
+    def slice(self, start: int, end: int) -> List[Value]:
+        """
+        Returns the values of a range of rows.
+
+        Args:
+            start (int): The first row.
+            end (int): The row after the last one.
+        """
+        return self.decode(self.data[start:end].tolist())
+
+    def take(self, rows: Iterable[int]) -> List[Value]:
+        """
+        Returns the values of some rows.
+
+        Args:
+            rows (Iterable[int]): The rows, in the order wanted.
+        """
+        data = self.data
+        return self.decode([int(data[row]) for row in rows])
+
+
+def load_columns(path: str, batch_size: int = 1024) -> List[Column]:
+    """
+    Reads a CSV file column by column, without keeping its rows.
+
+    The rows are read in batches, transposed, and each column of a batch
+    is converted at once. A column is read as integers as long as each of
+    its values is an integer written as str(int) writes it, so no text is
+    lost; otherwise it is dictionary-encoded.
+
+    Args:
+        path (str): The path of the CSV file.
+        batch_size (int): The number of rows converted at once.
+
+    Returns:
+        List[Column]: The columns, in the order of the header.
+
+    Raises:
+        ValueError: If a row has a different number of fields from the
+            header, or the columns do not end up with the same length.
+    """
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        width = len(header)
+        data = [array('q') for _ in header]
+        dictionaries: List[Optional[List[str]]] = [None] * width
+        lookups: List[Dict[str, int]] = [{} for _ in header]
+        while True:
+            batch = list(islice(reader, batch_size))
+            if not batch:
+                break
+            for row in batch:
+                if len(row) != width:
+                    raise ValueError(f"{path}: {row!r} does not have "
+                                     f"{width} fields")
+            for i, values in enumerate(zip(*batch)):
+                if dictionaries[i] is None:
+                    try:
+                        numbers = list(map(int, values))
+                        if list(map(str, numbers)) == list(values):
+                            # Converted whole first, so a value too large
+                            # for 'q' leaves data[i] untouched
+                            data[i].extend(array('q', numbers))
+                            continue
+                    except (ValueError, OverflowError):
+                        pass
+                    # Not integers: encode the column from now on
+                    dictionaries[i] = []
+                    previous = list(map(str, data[i]))
+                    data[i] = array('q')
+                    _encode(previous, data[i], dictionaries[i], lookups[i])
+                _encode(values, data[i], dictionaries[i], lookups[i])
+    lengths = {len(values) for values in data}
+    if len(lengths) > 1:
+        raise ValueError(f"{path}: columns of different lengths "
+                         f"{sorted(lengths)}")
+    return [Column(name, narrow(values), dictionary, lookup)
+            for name, values, dictionary, lookup in
+            zip(header, data, dictionaries, lookups)]
+
+
+def _encode(values: Sequence[str], codes: array, dictionary: List[str],
+            lookup: Dict[str, int]) -> None:
+    """
+    Appends the dictionary codes of values, adding the new ones.
+    """
+    for value in dict.fromkeys(values):
+        if value not in lookup:
+            lookup[value] = len(dictionary)
+            dictionary.append(value)
+    codes.extend(map(lookup.__getitem__, values))
+
+
+class Server:
+    """Server class to paginate a database of popular baby names.
+
+    The dataset is loaded as typed columns instead of a list of rows:
+    years, counts and ranks are integers, and names, genders and
+    ethnicities are dictionary-encoded. Rows are only built for the pages
+    returned, with integers where the file has integers.
+    """
+    DATA_FILE = "Popular_Baby_Names.csv"
+
+    def __init__(self):
+        self.__columns = None
+
+    def columns(self) -> List[Column]:
+        """Cached columns of the dataset
+        """
+        if self.__columns is None:
+            self.__columns = load_columns(self.DATA_FILE)
+        return self.__columns
+
+    def __len__(self) -> int:
+        """
+        Returns the number of rows.
+        """
+        columns = self.columns()
+        return len(columns[0]) if columns else 0
+
+    def rows(self, start: int, end: int) -> List[List[Value]]:
+        """
+        Builds a range of rows.
+
+        Args:
+            start (int): The first row.
+            end (int): The row after the last one.
+
+        Returns:
+            List[List[Value]]: The rows, one value per column.
+        """
+        return [list(row) for row in zip(*(column.slice(start, end)
+                                           for column in self.columns()))]
+
+    def get_page(self, page: int = 1,
+                 page_size: int = 10) -> List[List[Value]]:
+        """
+        Gets a specific page of the dataset.
+
+        Args:
+            page (int): The page number to retrieve.
+            page_size (int): The number of items on the page.
+
+        Returns:
+            List[List[Value]]: The list of rows for the requested page,
+                               or an empty list if the page is out of range.
+        """
+        assert isinstance(page, int) and page > 0
+        assert isinstance(page_size, int) and page_size > 0
+
+        start_index, end_index = index_range(page, page_size)
+        return self.rows(start_index, min(end_index, len(self)))
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+A module for filtered and sorted pagination with secondary indexes.
+"""
+from array import array
+from itertools import chain
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, \
+    Union
+
+columnar = __import__('6-columnar_pagination')
+Column = columnar.Column
+Value = columnar.Value
+index_range = columnar.index_range
+
+Filters = Mapping[str, Union[Value, Sequence[Value]]]
+OrderBy = Union[str, Sequence[str]]
+
+
+class Server(columnar.Server):
+    """Server class to paginate a database of popular baby names, filtered
+    and sorted.
+
+    Filtering uses secondary indexes: for each column filtered on, the
+    sorted row indexes of each of its values, built on first use. A query
+    only reads the rows of its most selective filter, and checks the
+    other filters on those rows alone. The rows of a query are cached, so
+    its next pages cost O(page_size).
+    """
+    QUERY_CACHE_SIZE = 128
+
+    def __init__(self):
+        super().__init__()
+        self.__indexes: Dict[str, Dict[int, array]] = {}
+        self.__ranks: Dict[str, Optional[List[int]]] = {}
+        self.__orders: Dict[Tuple[Tuple[str, bool], ...], array] = {}
+        self.__queries: Dict[Tuple, Sequence[int]] = {}
+
+    def column(self, name: str) -> Column:
+        """
+        Returns a column by name.
+
+        Args:
+            name (str): The name of the column, as in the header.
+
+        Raises:
+            ValueError: If there is no such column.
+        """
+        for column in self.columns():
+            if column.name == name:
+                return column
+        raise ValueError(f"unknown column {name!r}")
+
+    def index(self, name: str) -> Dict[int, array]:
+        """Cached secondary index of a column: each value, or dictionary
+        code, with the sorted indexes of its rows
+        """
+        index = self.__indexes.get(name)
+        if index is None:
+            index = {}
+            for row, code in enumerate(self.column(name).data.tolist()):
+                rows = index.get(code)
+                if rows is None:
+                    rows = index[code] = array('I')
+                rows.append(row)
+            self.__indexes[name] = index
+        return index
+
+    @staticmethod
+    def _code(column: Column, value: Value) -> Optional[int]:
+        """
+        Returns how a value is stored in a column, or None if it cannot be
+        in it. An integer column also matches the text of an integer.
+        """
+        if column.codes is not None:
+            return column.codes.get(str(value))
+        try:
+            code = int(value)
+        except (TypeError, ValueError):
+            return None
+        return code if str(code) == str(value) else None
+
+    def ranks(self, name: str) -> Optional[List[int]]:
+        """Cached rank of each dictionary code of a string column in the
+        sorted values, or None for an integer column
+        """
+        if name not in self.__ranks:
+            dictionary = self.column(name).dictionary
+            ranks = None
+            if dictionary is not None:
+                ranks = [0] * len(dictionary)
+                for rank, code in enumerate(sorted(
+                        range(len(dictionary)), key=dictionary.__getitem__)):
+                    ranks[code] = rank
+            self.__ranks[name] = ranks
+        return self.__ranks[name]
+
+    def _sort_key(self, order: Tuple[Tuple[str, bool], ...]) -> Any:
+        """
+        Returns the sort key of rows for (column name, descending) pairs.
+        String columns sort by value, not by dictionary code.
+        """
+        keys = [(self.column(name).data, self.ranks(name),
+                 -1 if descending else 1) for name, descending in order]
+
+        def key(row: int) -> Tuple[int, ...]:
+            """
+            Returns the sort key of a row.
+            """
+            # int(): a NumPy column holds unsigned scalars, which cannot
+            # be negated
+            return tuple(sign * (ranks[data[row]] if ranks is not None
+                                 else int(data[row]))
+                         for data, ranks, sign in keys)
+        return key
+
+    def order(self, order: Tuple[Tuple[str, bool], ...]) -> array:
+        """Cached indexes of all the rows in a sort order
+        """
+        rows = self.__orders.get(order)
+        if rows is None:
+            rows = array('I', sorted(range(len(self)),
+                                     key=self._sort_key(order)))
+            self.__orders[order] = rows
+        return rows
+
+    def select(self, filters: Optional[Filters] = None,
+               order_by: Optional[OrderBy] = None) -> Sequence[int]:
+        """
+        Finds the rows of a query.
+
+        Args:
+            filters (Optional[Filters]): Column names with the value, or
+                the list of values, their rows must have.
+            order_by (Optional[OrderBy]): Column names to sort by, each
+                prefixed with "-" to sort in descending order. Rows equal
+                on every column keep the order of the file.
+
+        Returns:
+            Sequence[int]: The indexes of the rows, in order.
+
+        Raises:
+            ValueError: If a column does not exist.
+        """
+        if isinstance(order_by, str):
+            order_by = [order_by]
+        order = tuple((name.lstrip('-'), name.startswith('-'))
+                      for name in order_by or ())
+        conditions = []
+        for name, values in (filters or {}).items():
+            if isinstance(values, (str, int)):
+                values = [values]
+            column = self.column(name)
+            codes = {self._code(column, value) for value in values} - {None}
+            conditions.append((name, frozenset(codes)))
+        key = (tuple(sorted(conditions)), order)
+        rows = self.__queries.get(key)
+        if rows is not None:
+            return rows
+
+        if not conditions:
+            rows = self.order(order) if order else range(len(self))
+        else:
+            # Start from the filter matching the fewest rows
+            sizes = []
+            for name, codes in conditions:
+                index = self.index(name)
+                sizes.append((sum(len(index.get(code, ()))
+                                  for code in codes), name, codes))
+            sizes.sort(key=lambda size: size[0])
+            _, name, codes = sizes[0]
+            index = self.index(name)
+            rows = sorted(chain.from_iterable(
+                index.get(code, ()) for code in codes))
+            for _, name, codes in sizes[1:]:
+                data = self.column(name).data
+                rows = [row for row in rows if data[row] in codes]
+            if order:
+                rows.sort(key=self._sort_key(order))
+            rows = array('I', rows)
+
+        if len(self.__queries) >= self.QUERY_CACHE_SIZE:
+            del self.__queries[next(iter(self.__queries))]
+        self.__queries[key] = rows
+        return rows
+
+    def get_page(self, page: int = 1, page_size: int = 10,
+                 filters: Optional[Filters] = None,
+                 order_by: Optional[OrderBy] = None) -> List[List[Value]]:
+        """
+        Gets a specific page of the rows matching filters, in an order.
+
+        Args:
+            page (int): The page number to retrieve.
+            page_size (int): The number of items on the page.
+            filters (Optional[Filters]): e.g. {"Gender": "FEMALE",
+                "Year of Birth": 2016}. See select.
+            order_by (Optional[OrderBy]): e.g. "-Count". See select.
+
+        Returns:
+            List[List[Value]]: The list of rows for the requested page,
+                               or an empty list if the page is out of range.
+        """
+        assert isinstance(page, int) and page > 0
+        assert isinstance(page_size, int) and page_size > 0
+
+        if filters is None and order_by is None:
+            return super().get_page(page, page_size)
+        start_index, end_index = index_range(page, page_size)
+        rows = self.select(filters, order_by)[start_index:end_index]
+        return [list(row) for row in zip(*(column.take(rows)
+                                           for column in self.columns()))]
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the columnar Server against the list of rows of dataset(),
+on Popular_Baby_Names.csv or a generated copy of it.
+
+For each representation it reports the load time (best of --repeat
+runs), the memory it keeps once loaded and the peak memory of loading,
+both measured with tracemalloc, and the time of a page.
+
+Usage: ./bench_columnar.py [-s SIZE_GB] [-r REPEAT] [CSV]
+"""
+import argparse
+import gc
+import os
+import time
+import tracemalloc
+from typing import Any, Callable, Tuple
+
+generate = __import__('bench_mmap').generate
+
+
+def measure(load: Callable[[], Any],
+            repeat: int) -> Tuple[float, int, int, Any]:
+    """
+    Measures a loader.
+
+    Args:
+        load (Callable[[], Any]): Loads the dataset and returns a server
+            whose first page is then timed.
+        repeat (int): The number of timed loads.
+
+    Returns:
+        Tuple[float, int, int, Any]: The best load time, the memory kept
+        and the peak memory in bytes, and the server.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        load()
+        best = min(best, time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    server = load()
+    kept, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, kept, peak, server
+
+
+def main() -> None:
+    """
+    Parses the command line and prints one line per representation.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('csv', nargs='?', default="Popular_Baby_Names.csv",
+                        help="CSV file, generated if missing")
+    parser.add_argument('-s', '--size-gb', type=float, default=0.05,
+                        help="size of the generated CSV, in GB")
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help="number of timed loads")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.csv):
+        generate(args.csv, args.size_gb)
+    print(f"{args.csv}: {os.path.getsize(args.csv) / (1 << 20):.1f} MB")
+
+    def rows() -> Any:
+        server = __import__('1-simple_pagination').Server()
+        server.DATA_FILE = args.csv
+        server.dataset()
+        return server
+
+    def columns() -> Any:
+        server = __import__('6-columnar_pagination').Server()
+        server.DATA_FILE = args.csv
+        server.columns()
+        return server
+
+    for name, load in (("dataset()", rows), ("columnar", columns)):
+        load_time, kept, peak, server = measure(load, args.repeat)
+        start = time.perf_counter()
+        for page in range(1, 1001):
+            server.get_page(page, 10)
+        page_time = (time.perf_counter() - start) / 1000
+        print(f"{name:>10}: load {load_time:7.3f} s, kept "
+              f"{kept / (1 << 20):8.1f} MB, peak {peak / (1 << 20):8.1f} MB, "
+              f"page {page_time * 1e6:6.1f} us")
+        del server
+        gc.collect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the memory-mapped pagination Server against the list-based
+one of 1-simple_pagination, on a generated baby-names CSV.
+
+Each measurement runs in its own process, so that its peak RSS is its
+own: the time to the first page, the time of a page deep in the file,
+and the peak RSS. The list-based Server loads the whole file, so it is
+skipped for files above --baseline-max-gb.
+
+Usage: ./bench_mmap.py [-s SIZE_GB] [--baseline-max-gb GB] CSV
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+HEADER = ["Year of Birth", "Gender", "Ethnicity", "Child's First Name",
+          "Count", "Rank"]
+ETHNICITIES = ["ASIAN AND PACIFIC ISLANDER", "BLACK NON HISPANIC",
+               "HISPANIC", "WHITE NON HISPANIC"]
+NAMES = ["Olivia", "Chloe", "Sophia", "Emma", "Ethan", "Jayden", "Liam",
+         "Noah", "Madison", "Isabella"]
+
+
+def generate(path: str, size_gb: float) -> None:
+    """
+    Writes a CSV shaped like Popular_Baby_Names.csv of about size_gb GB,
+    by repeating a block of random rows.
+
+    Args:
+        path (str): The path of the CSV file to create.
+        size_gb (float): The size of the file, in GB.
+    """
+    rng = random.Random(0)
+    block = io.StringIO()
+    writer = csv.writer(block)
+    for _ in range(20000):
+        writer.writerow([rng.randint(2011, 2016),
+                         rng.choice(["FEMALE", "MALE"]),
+                         rng.choice(ETHNICITIES), rng.choice(NAMES),
+                         rng.randint(10, 300), rng.randint(1, 100)])
+    data = block.getvalue().encode('utf-8')
+    target = int(size_gb * (1 << 30))
+    with open(path, 'wb') as f:
+        f.write((','.join(HEADER) + '\r\n').encode('utf-8'))
+        while f.tell() < target:
+            f.write(data)
+
+
+def child(mode: str, path: str) -> None:
+    """
+    Runs one measurement and prints its results on one line.
+
+    Args:
+        mode (str): "list", "mmap-cold" or "mmap-warm".
+        path (str): The path of the CSV file.
+    """
+    if mode == "list":
+        server = __import__('1-simple_pagination').Server()
+    else:
+        server = __import__('4-mmap_pagination').Server()
+    server.DATA_FILE = path
+    start = time.perf_counter()
+    server.get_page(1, 10)
+    first = time.perf_counter() - start
+    rows = len(server.dataset()) if mode == "list" else len(server)
+    start = time.perf_counter()
+    for page in range(max(1, rows // 10 - 99), rows // 10 + 1):
+        server.get_page(page, 10)
+    deep = (time.perf_counter() - start) / 100
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode:>10}: first page {first:9.3f} s, deep page "
+          f"{deep * 1e6:9.1f} us, peak RSS {rss:9.1f} MB, {rows} rows")
+
+
+def main() -> None:
+    """
+    Parses the command line, generates the CSV if needed and runs each
+    measurement in a child process.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('csv', help="CSV file, generated if missing")
+    parser.add_argument('-s', '--size-gb', type=float, default=2.0,
+                        help="size of the generated CSV, in GB")
+    parser.add_argument('--baseline-max-gb', type=float, default=0.25,
+                        help="largest file the list-based Server loads")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.csv)
+        return
+    if not os.path.exists(args.csv):
+        generate(args.csv, args.size_gb)
+    size_gb = os.path.getsize(args.csv) / (1 << 30)
+    print(f"{args.csv}: {size_gb:.2f} GB")
+    if os.path.exists(args.csv + ".idx"):
+        os.remove(args.csv + ".idx")
+    modes = ["mmap-cold", "mmap-warm"]
+    if size_gb <= args.baseline_max_gb:
+        modes.insert(0, "list")
+    else:
+        print(f"{'list':>10}: skipped above {args.baseline_max_gb} GB")
+    for mode in modes:
+        subprocess.run([sys.executable, os.path.abspath(__file__),
+                        '--child', mode, os.path.abspath(args.csv)],
+                       check=True,
+                       cwd=os.path.dirname(os.path.abspath(__file__)))
+
+
+if __name__ == "__main__":
+    main()